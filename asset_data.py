@@ -0,0 +1,152 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import perf
+
+# Column positions in the normalized frame
+ASSET_NUMBER_COL = 0
+STATION_COL = 1
+TYPE_COL = 2
+ASSET_NAME_COL = 3
+QUANTITY_COL = 4
+DIMENSION_COLS = (5, 6, 7)
+IMAGE_COL = 9
+VOLTAGE_COL = 10
+POWER_COL = 11
+STATUS_COL = 12
+# Columns the sheet keeps in merged cells, filled down an asset's rows
+MERGED_COLS = (TYPE_COL, QUANTITY_COL, *DIMENSION_COLS, IMAGE_COL, VOLTAGE_COL, POWER_COL, STATUS_COL)
+
+
+def fetch_sheet_values(client, sheet_url, sheet_index=0):
+    """Fetch every cell of a worksheet as a list of rows"""
+    spreadsheet = client.open_by_url(sheet_url)
+    worksheet = spreadsheet.get_worksheet(sheet_index)
+    return worksheet.get_all_values()
+
+
+def combine_headers(row1_headers, row2_headers):
+    """Merge the two header rows into unique column names"""
+    combined_headers = []
+    for i in range(len(row1_headers)):
+        header1 = row1_headers[i].strip() if i < len(row1_headers) else ''
+        header2 = row2_headers[i].strip() if i < len(row2_headers) else ''
+
+        if header1 and header2:
+            combined = f"{header1} {header2}"
+        elif header1:
+            combined = header1
+        elif header2:
+            combined = header2
+        else:
+            combined = 'Unnamed'
+
+        combined_headers.append(combined)
+
+    unique_headers = []
+    header_counts = {}
+
+    for header in combined_headers:
+        if header in header_counts:
+            header_counts[header] += 1
+            unique_headers.append(f"{header}_{header_counts[header]}")
+        else:
+            header_counts[header] = 0
+            unique_headers.append(header)
+
+    return unique_headers
+
+
+def frame_from_values(data):
+    """Build the asset DataFrame from raw worksheet values (title row, two header rows, then data)"""
+    if not data or len(data) < 4:
+        return pd.DataFrame()
+
+    with perf.span("combine_headers"):
+        unique_headers = combine_headers(data[1], data[2])
+
+    return pd.DataFrame(data[3:], columns=unique_headers)
+
+
+def normalize_frame(df):
+    """Drop the leading spacer column so column positions match the card layout"""
+    return df.drop(df.columns[0], axis=1)
+
+
+def group_by_asset(df, asset_name_col):
+    """(asset name, rows) pairs in the order the card grid shows them"""
+    return list(df.groupby(asset_name_col))
+
+
+def frame_version(df):
+    """Content hash identifying one version of the asset data.
+
+    Not cached on the frame: pandas copies attrs into filtered and edited
+    frames, which would then report the parent's version.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=8).hexdigest()
+
+
+def resolve_merged(df, asset_name_col, columns, blank='N/A'):
+    """Fill cells left blank by merged ranges from the rows above with the same asset name"""
+    values = df[columns]
+    values = values.mask(values.apply(lambda s: s.astype(str).str.strip() == ''))
+    names = df[asset_name_col]
+    run_id = (names != names.shift()).cumsum()
+    return values.groupby(run_id).ffill().fillna(blank)
+
+
+def resolve_rows(df, asset_name_col):
+    """Copy of df with every merged column filled in, left blank where nothing is found above"""
+    merged = [df.columns[position] for position in MERGED_COLS if position < len(df.columns)]
+    resolved = df.copy()
+    resolved[merged] = resolve_merged(df, asset_name_col, merged, blank='')
+    return resolved
+
+
+def row_keys(df, key_col):
+    """Asset numbers as row keys, with repeats suffixed (#1, #2, ...) so every key is unique"""
+    keys = df[key_col].astype(str).str.strip()
+    repeat = keys.groupby(keys).cumcount()
+    return keys.where(repeat == 0, keys + '#' + repeat.astype(str))
+
+
+def row_hashes(df, key_col):
+    """Hash of every row's contents, indexed by row key"""
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return pd.Series(hashes.to_numpy(), index=pd.Index(row_keys(df, key_col)), name='hash')
+
+
+def diff_hashes(old, new):
+    """Keys added, removed and changed between two row_hashes results"""
+    positions = old.index.get_indexer(new.index)
+    present = positions >= 0
+    seen = np.zeros(len(old), dtype=bool)
+    seen[positions[present]] = True
+
+    added = new.index[~present]
+    removed = old.index[~seen]
+    changed = new.index[present][new.to_numpy()[present] != old.to_numpy()[positions[present]]]
+    return added, removed, changed
+
+
+def write_snapshot(df, path):
+    """Save the loaded frame so a new process can paint before any live fetch"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, max_age=None):
+    """Frame saved by write_snapshot, or None when missing or older than max_age seconds"""
+    if not os.path.exists(path):
+        return None
+    if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+        return None
+    return pd.read_parquet(path)
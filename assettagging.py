@@ -1,541 +1,53 @@
 import streamlit as st
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 import warnings
 import io
+import os
+import hashlib
+from datetime import date, datetime
+
+import asset_data
+import cards
+import changes
+import export
+import facets
+import history
+import perf
+import rollups
+import stylesheet
+import validation
 
 warnings.filterwarnings('ignore')
+
+perf.begin_rerun()
+
 st.set_page_config(page_title="Asset Tagging", layout="wide")
 
-st.markdown("""
-<style>
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    .block-container {
-        padding: 2.5rem 3rem;
-        max-width: 1600px;
-        margin: 0 auto;
-        background: linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%);
-        min-height: 100vh;
-    }
-    [data-testid="column"] {padding: 0 10px;}
-    
-    /* Header styling - Modern with gradient accent */
-    .header-title {
-        font-size: 50px;
-        font-weight: 700;
-        background: linear-gradient(135deg, #1a1a1a 0%, #4a4a4a 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 0.5rem;
-        letter-spacing: -0.5px;
-    }
-    .header-subtitle {
-        font-size: 16px;
-        color: #888;
-        margin-bottom: 2.5rem;
-        font-weight: 400;
-    }
-    
-    /* Tabs - Modern elevated design with smooth animations */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 0.75rem;
-        background: white;
-        padding: 0.75rem;
-        border-radius: 16px;
-        border: none;
-        margin-bottom: 2.5rem;
-        justify-content: center;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.08);
-    }
-    .stTabs [data-baseweb="tab"] {
-        height: 52px;
-        padding: 0 28px;
-        font-weight: 500;
-        font-size: 15px;
-        color: #666;
-        border: none;
-        background: transparent;
-        border-radius: 10px;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    .stTabs [data-baseweb="tab"]:hover {
-        color: #1a1a1a;
-        background: #f5f5f5;
-        transform: translateY(-2px);
-    }
-    .stTabs [aria-selected="true"] {
-        color: #1a1a1a;
-        background: linear-gradient(135deg, #FFD700 0%, #FFC107 100%);
-        font-weight: 600;
-        box-shadow: 0 4px 12px rgba(255, 215, 0, 0.3);
-    }
-    
-    /* Metrics - White with Colored accents */
-    [data-testid="stMetric"] {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 1px solid #e8e8e8;
-        position: relative;
-        overflow: hidden;
-        transition: all 0.2s ease;
-    }
-    [data-testid="stMetric"]::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 4px;
-    }
-    [data-testid="stMetric"]:nth-child(1)::before {
-        background: linear-gradient(90deg, #FFD700, #FFC107);
-    }
-    [data-testid="stMetric"]:nth-child(2)::before {
-        background: linear-gradient(90deg, #9e9e9e, #757575);
-    }
-    [data-testid="stMetric"]:nth-child(3)::before {
-        background: linear-gradient(90deg, #4a4a4a, #2d2d2d);
-    }
-    [data-testid="stMetric"]:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 16px rgba(0, 0, 0, 0.08);
-    }
-    [data-testid="stMetricValue"] {
-        font-size: 28px;
-        font-weight: 600;
-        color: #1a1a1a;
-    }
-    [data-testid="stMetricLabel"] {
-        font-size: 13px;
-        font-weight: 500;
-        color: #666;
-    }
-    
-    /* Input fields - Modern with subtle shadows */
-    .stTextInput > div > div > input {
-        border-radius: 12px;
-        border: 2px solid #e8e8e8;
-        padding: 12px 16px;
-        font-size: 15px;
-        transition: all 0.3s ease;
-        background: white;
-    }
-    .stTextInput > div > div > input:focus {
-        border-color: #FFD700;
-        box-shadow: 0 0 0 3px rgba(255, 215, 0, 0.15);
-        transform: translateY(-1px);
-    }
-    .stSelectbox > div > div {
-        border-radius: 12px;
-        border: 2px solid #e8e8e8;
-        transition: all 0.3s ease;
-        background: white;
-    }
-    .stSelectbox > div > div:hover {
-        border-color: #FFD700;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.06);
-    }
-    
-    /* Select box label */
-    .stSelectbox label {
-        font-size: 14px;
-        font-weight: 600;
-        color: #1a1a1a;
-        margin-bottom: 0.5rem;
-    }
-    
-    /* Buttons - Yellow accent */
-    .stButton > button {
-        background: white !important;
-        border: 1px solid #e0e0e0 !important;
-        border-radius: 8px !important;
-        padding: 10px 18px !important;
-        text-align: center !important;
-        font-size: 13px !important;
-        font-weight: 500 !important;
-        color: #1a1a1a !important;
-        transition: all 0.2s ease !important;
-        height: auto !important;
-        margin-top: 8px !important;
-    }
-    .stButton > button:hover {
-        background: #FFD700 !important;
-        border-color: #FFD700 !important;
-        color: #1a1a1a !important;
-        box-shadow: 0 2px 8px rgba(255, 215, 0, 0.3) !important;
-    }
-    
-    /* Back button - Premium gradient design */
-    .back-button-container {
-        margin-bottom: 2rem;
-    }
-    .back-button-container .stButton > button {
-        background: linear-gradient(135deg, #1a1a1a 0%, #3a3a3a 100%) !important;
-        border: none !important;
-        color: white !important;
-        padding: 14px 28px !important;
-        font-weight: 600 !important;
-        font-size: 15px !important;
-        margin-top: 0 !important;
-        display: inline-flex !important;
-        align-items: center !important;
-        gap: 10px !important;
-        opacity: 1 !important;
-        width: auto !important;
-        height: auto !important;
-        cursor: pointer !important;
-        border-radius: 12px !important;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15) !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-    }
-    .back-button-container .stButton > button:hover {
-        background: linear-gradient(135deg, #FFD700 0%, #FFC107 100%) !important;
-        color: #1a1a1a !important;
-        transform: translateX(-6px) scale(1.02) !important;
-        box-shadow: 0 6px 20px rgba(255, 215, 0, 0.4) !important;
-    }
-    
-    /* Override for invisible card buttons */
-    .invisible-button-overlay .stButton > button {
-        opacity: 0 !important;
-        width: 100% !important;
-        height: 200px !important;
-    }
-    
-    /* Expander styling - Ultra modern with premium feel */
-    .streamlit-expanderHeader {
-        background: linear-gradient(135deg, #ffffff 0%, #fafafa 100%) !important;
-        border: 2px solid #e8e8e8 !important;
-        border-left: 5px solid #FFD700 !important;
-        border-radius: 14px !important;
-        padding: 20px 24px !important;
-        font-weight: 600 !important;
-        font-size: 16px !important;
-        margin-bottom: 18px !important;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.04) !important;
-    }
-    
-    .streamlit-expanderHeader:hover {
-        border-left-color: #FFC107 !important;
-        box-shadow: 0 6px 24px rgba(255, 215, 0, 0.2) !important;
-        transform: translateX(6px) scale(1.01);
-        background: linear-gradient(135deg, #ffffff 0%, #fffef8 100%) !important;
-    }
-    [data-testid="stExpander"] {
-        border: none !important;
-        margin-bottom: 1.25rem !important;
-    }
-    .streamlit-expanderContent {
-        background: white !important;
-        border: 2px solid #e8e8e8 !important;
-        border-top: none !important;
-        border-radius: 0 0 14px 14px !important;
-        padding: 0 !important;
-        margin-top: -10px !important;
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.06) !important;
-    }
-    
-    /* Modern Info Grid Styling - Premium card design */
-    .info-section {
-        padding: 2rem;
-        background: linear-gradient(135deg, #fafafa 0%, #ffffff 100%);
-        border-radius: 12px;
-        margin-bottom: 1.5rem;
-        box-shadow: inset 0 2px 8px rgba(0, 0, 0, 0.03);
-    }
-    
-    .info-row {
-        display: grid;
-        grid-template-columns: 160px 1fr;
-        gap: 1.5rem;
-        padding: 1rem 0;
-        border-bottom: 1px solid #e8e8e8;
-        align-items: start;
-        transition: all 0.2s ease;
-    }
-    
-    .info-row:hover {
-        background: rgba(255, 215, 0, 0.03);
-        padding-left: 0.5rem;
-        margin-left: -0.5rem;
-        border-radius: 8px;
-    }
-    
-    .info-row:last-child {
-        border-bottom: none;
-    }
-    
-    .info-label {
-        font-size: 13px;
-        font-weight: 700;
-        color: #666;
-        text-transform: uppercase;
-        letter-spacing: 0.8px;
-        padding-top: 3px;
-    }
-    
-    .info-value {
-        font-size: 15px;
-        font-weight: 500;
-        color: #1a1a1a;
-        line-height: 1.6;
-    }
-    
-    .image-section {
-        padding: 2rem;
-        background: white;
-    }
-    
-    .image-wrapper {
-        border-radius: 12px;
-        overflow: hidden;
-        border: 2px solid #e8e8e8;
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.08);
-        transition: all 0.3s ease;
-    }
-    
-    .image-wrapper:hover {
-        transform: scale(1.02);
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.12);
-    }
-    
-    /* Modern Detail Card Styling */
-    .detail-card {
-        background: white;
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin-bottom: 1rem;
-        border: 1px solid #e8e8e8;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.04);
-        transition: all 0.3s ease;
-    }
-    
-    .detail-card:hover {
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.08);
-        transform: translateY(-2px);
-    }
-    
-    .detail-header {
-        display: flex;
-        align-items: center;
-        gap: 12px;
-        padding-bottom: 1rem;
-        border-bottom: 2px solid #f5f5f5;
-        margin-bottom: 1.5rem;
-    }
-    
-    .detail-asset-number {
-        font-size: 20px;
-        font-weight: 600;
-        color: #1a1a1a;
-        flex: 1;
-    }
-    
-    .detail-badge {
-        padding: 6px 12px;
-        border-radius: 6px;
-        font-size: 12px;
-        font-weight: 500;
-        background: #FFD700;
-        color: #1a1a1a;
-    }
-    
-    .detail-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-        gap: 1.5rem;
-    }
-    
-    .detail-item {
-        display: flex;
-        flex-direction: column;
-        gap: 0.5rem;
-    }
-    
-    .detail-label {
-        font-size: 12px;
-        font-weight: 600;
-        color: #999;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    
-    .detail-value {
-        font-size: 15px;
-        font-weight: 500;
-        color: #1a1a1a;
-        line-height: 1.4;
-    }
-    
-    .detail-divider {
-        height: 1px;
-        background: linear-gradient(90deg, transparent, #e8e8e8, transparent);
-        margin: 1.5rem 0;
-    }
-    
-    .image-container {
-        background: #f8f8f8;
-        border-radius: 8px;
-        padding: 1rem;
-        text-align: center;
-        border: 2px dashed #e0e0e0;
-        min-height: 200px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-    }
-    
-    .image-placeholder {
-        color: #999;
-        font-size: 14px;
-    }
-    
-    /* Card styling - Ultra modern with premium shadows */
-    .asset-card {
-        background: white;
-        border: none;
-        border-radius: 16px;
-        overflow: hidden;
-        box-shadow: 0 4px 16px rgba(0, 0, 0, 0.08);
-        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        min-height: 180px;
-        margin-bottom: 1.75rem;
-        position: relative;
-    }
-    
-    .asset-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: linear-gradient(135deg, rgba(255, 215, 0, 0.03) 0%, transparent 100%);
-        opacity: 0;
-        transition: opacity 0.4s ease;
-    }
-    
-    .asset-card:hover {
-        box-shadow: 0 12px 32px rgba(0, 0, 0, 0.15);
-        transform: translateY(-8px) scale(1.02);
-    }
-    
-    .asset-card:hover::before {
-        opacity: 1;
-    }
-    
-    .asset-card-header {
-        padding: 1.5rem 1.5rem;
-        border-bottom: none;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .asset-card-header::after {
-        content: '';
-        position: absolute;
-        bottom: 0;
-        left: 50%;
-        transform: translateX(-50%);
-        width: 60%;
-        height: 1px;
-        background: rgba(255, 255, 255, 0.3);
-    }
-    
-    .asset-card-body {
-        padding: 1.5rem;
-        background: white;
-    }
-    
-    /* Color variations for cards - Enhanced gradients */
-    .card-yellow .asset-card-header {
-        background: linear-gradient(135deg, #FFD700 0%, #FFC107 100%);
-        box-shadow: inset 0 -2px 10px rgba(0, 0, 0, 0.1);
-    }
-    
-    .card-dark .asset-card-header {
-        background: linear-gradient(135deg, #2d2d2d 0%, #1a1a1a 100%);
-        box-shadow: inset 0 -2px 10px rgba(0, 0, 0, 0.3);
-    }
-    
-    .card-gray .asset-card-header {
-        background: linear-gradient(135deg, #757575 0%, #9e9e9e 100%);
-        box-shadow: inset 0 -2px 10px rgba(0, 0, 0, 0.2);
-    }
-    
-    .card-amber .asset-card-header {
-        background: linear-gradient(135deg, #FF8C00 0%, #FFA500 100%);
-        box-shadow: inset 0 -2px 10px rgba(0, 0, 0, 0.15);
-    }
-    
-    .asset-name {
-        font-size: 19px;
-        font-weight: 700;
-        color: white;
-        line-height: 1.4;
-        margin: 0;
-        text-shadow: 0 2px 4px rgba(0, 0, 0, 0.2);
-        letter-spacing: 0.3px;
-    }
-    
-    .asset-count {
-        font-size: 14px;
-        font-weight: 500;
-        color: #888;
-        line-height: 1.5;
-        margin-bottom: 1.25rem;
-    }
-    
-    .asset-footer {
-        padding-top: 1.25rem;
-        border-top: 2px solid #f5f5f5;
-        font-size: 14px;
-        font-weight: 600;
-        color: #999;
-        transition: all 0.3s ease;
-        display: flex;
-        align-items: center;
-        gap: 8px;
-    }
-    
-    .asset-footer::after {
-        content: '→';
-        font-size: 16px;
-        transition: transform 0.3s ease;
-    }
-    
-    .asset-card:hover .asset-footer {
-        color: #FFD700;
-    }
-    
-    .asset-card:hover .asset-footer::after {
-        transform: translateX(4px);
-    }
-    
-    /* Modal header */
-    .modal-header {
-        font-size: 20px;
-        font-weight: 600;
-        color: #1a1a1a;
-        margin-bottom: 1rem;
-        padding-bottom: 0.75rem;
-        border-bottom: 2px solid #FFD700;
-    }
-    
-    .modal-count {
-        color: #999;
-        font-weight: 400;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def stylesheet_html():
+    """Link to the minified stylesheet served from ./static, built once per process"""
+    if st.get_option("server.enableStaticServing"):
+        try:
+            name, digest = stylesheet.build_stylesheet()
+            return f'<link rel="stylesheet" href="app/static/{name}?v={digest}">'
+        except OSError:
+            pass
+    return stylesheet.inline_stylesheet()
+
+st.markdown(stylesheet_html(), unsafe_allow_html=True)
+
+# Google Sheets refresh interval, also the age up to which a local snapshot is served.
+# A snapshot is then cached like a live fetch, so after a restart the data can be
+# up to 2 x SHEET_TTL old before the next fetch from Google.
+SHEET_TTL = 300
+CACHE_DIR = os.environ.get(
+    "ASSET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".asset_cache")
+)
 
 @st.cache_resource
 def load_credentials():
+    perf.cache_miss("load_credentials")
     try:
         credentials_dict = {
             "type": st.secrets["google_credentials"]["type"],
@@ -550,6 +62,8 @@ def load_credentials():
             "client_x509_cert_url": st.secrets["google_credentials"]["client_x509_cert_url"]
         }
         scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+        # Imported here so a start served from a snapshot never loads the Google client libraries
+        from google.oauth2.service_account import Credentials
         return Credentials.from_service_account_info(credentials_dict, scopes=scopes)
     except Exception as e:
         st.error(f"Error loading credentials: {e}")
@@ -570,90 +84,514 @@ def convert_google_drive_url(url):
     
     return url
 
-@st.cache_data(ttl=300)
-def load_sheet_data(_credentials, sheet_url, sheet_index=0):
+def html(body):
+    """HTML block, counted in the perf "elements" counter"""
+    perf.incr("elements")
+    st.markdown(body, unsafe_allow_html=True)
+
+def image(url):
+    """Image by URL, counted in the perf "elements" and "images" counters.
+
+    Only the URL is sent; the browser fetches the image itself, so there is
+    no server-side fetch to time.
+    """
+    perf.incr("elements")
+    perf.incr("images")
+    st.image(url, use_container_width=True)
+
+def snapshot_path(sheet_url, sheet_index):
+    sheet_id = hashlib.blake2b(f"{sheet_url}#{sheet_index}".encode("utf-8"), digest_size=6).hexdigest()
+    return os.path.join(CACHE_DIR, f"snapshot-{sheet_id}.parquet")
+
+@st.cache_data(ttl=SHEET_TTL)
+def load_sheet_data(sheet_url, sheet_index=0):
+    """The sheet as a DataFrame and its version hash, computed once per load"""
+    perf.cache_miss("load_sheet_data")
+    path = snapshot_path(sheet_url, sheet_index)
+    
+    # A new server process paints from a recent snapshot instead of waiting on Google
+    with perf.span("read_snapshot"):
+        snapshot = asset_data.read_snapshot(path, max_age=SHEET_TTL)
+    if snapshot is not None:
+        return snapshot, asset_data.frame_version(snapshot)
+    
+    with perf.cached_call("load_credentials"):
+        credentials = load_credentials()
+    if credentials is None:
+        return pd.DataFrame(), None
+    
     try:
-        client = gspread.authorize(_credentials)
-        spreadsheet = client.open_by_url(sheet_url)
-        worksheet = spreadsheet.get_worksheet(sheet_index)
-        data = worksheet.get_all_values()
+        import gspread
+        client = gspread.authorize(credentials)
+        with perf.span("fetch_sheet"):
+            data = asset_data.fetch_sheet_values(client, sheet_url, sheet_index)
+        df = asset_data.frame_from_values(data)
+        if not df.empty:
+            try:
+                asset_data.write_snapshot(df, path)
+            except OSError:
+                pass
+        return df, asset_data.frame_version(df)
+    except Exception as e:
+        st.error(f"Error loading sheet data: {e}")
+        return pd.DataFrame(), None
+
+@st.cache_resource(max_entries=2)
+def load_facet_index(version, _resolved):
+    perf.cache_miss("load_facet_index")
+    return facets.FacetIndex(_resolved)
+
+FACET_FILTERS = {
+    'status': 'Status',
+    'voltage': 'Voltage',
+    'power': 'Power'
+}
+
+def render_facet_filters(index):
+    """Status/voltage/power filters with live counts; returns the selected values per facet"""
+    selections = {}
+    for facet in FACET_FILTERS:
+        key = f"facet_{facet}"
+        # Drop values that disappeared with a data refresh
+        if key in st.session_state:
+            st.session_state[key] = [v for v in st.session_state[key] if v in index.masks[facet]]
+        selections[facet] = st.session_state.get(key, [])
+    
+    counts = index.counts(selections)
+    
+    with st.expander("Filters", expanded=any(selections.values())):
+        filter_cols = st.columns(len(FACET_FILTERS))
+        for filter_col, (facet, label) in zip(filter_cols, FACET_FILTERS.items()):
+            with filter_col:
+                facet_counts = counts[facet]
+                selections[facet] = st.multiselect(
+                    label,
+                    options=index.labels[facet],
+                    format_func=lambda value, facet_counts=facet_counts: f"{value} ({facet_counts.get(value, 0)})",
+                    key=f"facet_{facet}"
+                )
         
-        if not data or len(data) < 4:
-            return pd.DataFrame()
+        station_counts = " · ".join(f"{station} {count}" for station, count in counts['station'].items() if count)
+        st.caption(f"{sum(counts['station'].values())} matching assets — {station_counts}")
+    
+    return selections
+
+@st.cache_resource
+def load_rollup_store():
+    return rollups.RollupStore()
+
+def render_station_rollups(rollup, station_names):
+    """Overview of units by status and type, and rated power, per station"""
+    import altair as alt
+    
+    units = rollup.units.reindex(station_names, fill_value=0)
+    power_kw = rollup.power_watts.reindex(station_names, fill_value=0) / 1000
+    unparsed = rollup.unparsed_power.reindex(station_names, fill_value=0)
+    
+    metric_cols = st.columns(len(station_names))
+    for metric_col, station in zip(metric_cols, station_names):
+        with metric_col:
+            st.metric(station, f"{units[station]:,} units")
+            st.caption(f"{power_kw[station]:,.1f} kW total rated power")
+            if unparsed[station]:
+                st.caption(f"{unparsed[station]:,} power ratings could not be read and are not counted")
+    
+    st.markdown("<div style='margin: 1.5rem 0;'></div>", unsafe_allow_html=True)
+    
+    def stacked_bar(counts, category):
+        data = (counts.reindex(station_names).fillna(0).astype(int)
+                .rename_axis(index='station', columns=category)
+                .stack().rename('units').reset_index())
+        return alt.Chart(data).mark_bar().encode(
+            x=alt.X('units:Q', title='Units'),
+            y=alt.Y('station:N', title=None, sort=station_names),
+            color=alt.Color(f'{category}:N', title=category.title()),
+            tooltip=['station', category, 'units']
+        )
+    
+    status_col, type_col = st.columns(2)
+    with status_col:
+        st.markdown('<div class="info-label">Units by status</div>', unsafe_allow_html=True)
+        st.altair_chart(stacked_bar(rollup.status_counts, 'status'), use_container_width=True)
+    with type_col:
+        st.markdown('<div class="info-label">Units by type</div>', unsafe_allow_html=True)
+        st.altair_chart(stacked_bar(rollup.type_counts, 'type'), use_container_width=True)
+    
+    power = pd.DataFrame({'station': station_names, 'kW': power_kw.to_numpy()})
+    st.markdown('<div class="info-label">Total rated power (kW)</div>', unsafe_allow_html=True)
+    st.altair_chart(alt.Chart(power).mark_bar(color='#FFC107').encode(
+        x=alt.X('kW:Q', title='kW'),
+        y=alt.Y('station:N', title=None, sort=station_names),
+        tooltip=['station', alt.Tooltip('kW:Q', format=',.1f')]
+    ), use_container_width=True)
+
+@st.cache_resource
+def load_history_store():
+    return history.HistoryStore()
+
+def render_history(store):
+    """Point-in-time inventory and per-asset change history"""
+    if not store.versions:
+        st.info("No history recorded yet")
+        return
+    
+    first_sync = datetime.fromtimestamp(store.versions[0]["timestamp"]).date()
+    
+    with st.form("history_query"):
+        date_col, asset_col = st.columns(2)
+        with date_col:
+            as_of_date = st.date_input("Inventory as of", value=date.today(), min_value=first_sync)
+        with asset_col:
+            asset_number = st.text_input("Asset number (optional)")
+        submitted = st.form_submit_button("Show history")
+    
+    if submitted:
+        with perf.span("history_query"):
+            inventory = store.as_of(datetime.combine(as_of_date, datetime.max.time()).timestamp())
+            asset_changes = store.asset_history(asset_number) if asset_number.strip() else None
         
-        row1_headers = data[1]
-        row2_headers = data[2]
+        if inventory is None:
+            st.info(f"No inventory recorded on or before {as_of_date}")
+        else:
+            st.markdown(f'<div class="info-label">Inventory as of {as_of_date} ({len(inventory):,} rows)</div>', unsafe_allow_html=True)
+            st.dataframe(inventory, hide_index=True, use_container_width=True)
         
-        combined_headers = []
-        for i in range(len(row1_headers)):
-            header1 = row1_headers[i].strip() if i < len(row1_headers) else ''
-            header2 = row2_headers[i].strip() if i < len(row2_headers) else ''
-            
-            if header1 and header2:
-                combined = f"{header1} {header2}"
-            elif header1:
-                combined = header1
-            elif header2:
-                combined = header2
+        if asset_changes is not None:
+            st.markdown(f'<div class="info-label">History of {asset_number.strip()}</div>', unsafe_allow_html=True)
+            if asset_changes.empty:
+                st.info("No recorded changes for this asset")
             else:
-                combined = 'Unnamed'
-            
-            combined_headers.append(combined)
+                st.dataframe(asset_changes, hide_index=True, use_container_width=True)
+    
+    recent = pd.DataFrame(store.versions[-10:][::-1])
+    recent["timestamp"] = pd.to_datetime(recent["timestamp"], unit="s")
+    st.markdown('<div class="info-label">Recent syncs</div>', unsafe_allow_html=True)
+    st.dataframe(recent[["seq", "timestamp", "added", "removed", "changed"]], hide_index=True, use_container_width=True)
+
+@st.cache_resource
+def load_validator(station_values):
+    return validation.Validator(station_values)
+
+def render_data_quality(report):
+    """Issues found in the sheet by the last validation pass"""
+    label = f"Data quality — {len(report):,} issues" if len(report) else "Data quality — no issues"
+    with st.expander(label):
+        if report.empty:
+            st.success("No issues found in the latest sync")
+            return
         
-        unique_headers = []
-        header_counts = {}
+        summary = report.groupby(['rule', 'column']).size().rename('issues').reset_index()
+        st.dataframe(summary, hide_index=True, use_container_width=True)
+        st.dataframe(report, hide_index=True, use_container_width=True)
+
+@st.cache_resource(max_entries=2)
+def load_resolved_rows(version, _df, asset_name_col):
+    """Rows with merged cells filled in, and their hashes keyed by asset number"""
+    perf.cache_miss("load_resolved_rows")
+    resolved = asset_data.resolve_rows(_df, asset_name_col)
+    return resolved, asset_data.row_hashes(resolved, resolved.columns[0])
+
+@st.cache_resource
+def load_change_feed():
+    return changes.ChangeFeed()
+
+def render_change_feed(feed):
+    """Changes since this session last marked the feed as seen; returns the changed rows"""
+    if 'last_seen_version' not in st.session_state:
+        # First visit: everything still in the buffer counts as new
+        st.session_state['last_seen_version'] = feed.change_sets[0]['from'] if feed.change_sets else feed.version
+    
+    changed_rows, truncated = feed.changed_rows(st.session_state['last_seen_version'])
+    label = f"What's changed — {len(changed_rows):,} updates" if len(changed_rows) else "What's changed — nothing new"
+    
+    with st.expander(label):
+        if changed_rows.empty:
+            st.info("No changes since your last visit")
+            return changed_rows
         
-        for header in combined_headers:
-            if header in header_counts:
-                header_counts[header] += 1
-                unique_headers.append(f"{header}_{header_counts[header]}")
-            else:
-                header_counts[header] = 0
-                unique_headers.append(header)
+        if truncated:
+            st.caption("Older changes are no longer kept; showing the most recent ones")
+        summary = changed_rows['change'].where(changed_rows['change'].isin(['added', 'removed', 'updated']), 'status changed')
+        st.caption(" · ".join(f"{count} {kind}" for kind, count in summary.value_counts().items()))
+        st.dataframe(changed_rows, hide_index=True, use_container_width=True)
         
-        df = pd.DataFrame(data[3:], columns=unique_headers)
-        return df
-    except Exception as e:
-        st.error(f"Error loading sheet data: {e}")
-        return pd.DataFrame()
+        if st.button("Mark all as seen", key="changes_mark_seen"):
+            st.session_state['last_seen_version'] = feed.version
+            st.rerun()
+    
+    return changed_rows
 
-# Main App
-st.markdown('<div class="header-title">Commissary Assets</div>', unsafe_allow_html=True)
-st.markdown('<div class="header-subtitle">List of assets in the commissary</div>', unsafe_allow_html=True)
+def render_asset_details(df, station_key, asset_name_col):
+    # Modal view
+    html(f'<div class="modal-header">{st.session_state[f"modal_{station_key}"]} <span class="modal-count">({len(st.session_state[f"modal_data_{station_key}"])} items)</span></div>')
+    
+    # Back button with custom styling
+    html('<div class="back-button-container">')
+    if st.button("← Back to Assets", key=f"close_{station_key}"):
+        # Clear both session state and query params
+        if f'modal_{station_key}' in st.session_state:
+            del st.session_state[f'modal_{station_key}']
+        if f'modal_data_{station_key}' in st.session_state:
+            del st.session_state[f'modal_data_{station_key}']
+        st.query_params.clear()
+        st.rerun()
+    html('</div>')
+    
+    html("<div style='margin: 1rem 0;'></div>")
+    
+    for idx, row in st.session_state[f'modal_data_{station_key}'].iterrows():
+        asset_number = row.get(df.columns[0], 'N/A')
+        with st.expander(asset_number):
+            # Helper function to get value from merged cells
+            def get_merged_value(column_index):
+                value = row.get(df.columns[column_index], "")
+                if not value or str(value).strip() == "":
+                    # Look backwards through the dataframe to find the value
+                    current_asset_name = row.get(asset_name_col, "")
+                    for prev_idx in range(idx - 1, -1, -1):
+                        try:
+                            prev_row = st.session_state[f'modal_data_{station_key}'].iloc[prev_idx - st.session_state[f'modal_data_{station_key}'].index[0]]
+                            if prev_row.get(asset_name_col, "") == current_asset_name:
+                                prev_value = prev_row.get(df.columns[column_index], "")
+                                if prev_value and str(prev_value).strip() != "":
+                                    return prev_value
+                            else:
+                                break
+                        except:
+                            break
+                return value if value else "N/A"
+            
+            # Create two main columns: info (80%) and image (20%)
+            info_col, image_col = st.columns([8, 2])
+            
+            with info_col:
+                html("""
+                <div class="info-section">
+                """)
+                
+                # Row 1: Type and Quantity
+                html(cards.info_row_html("Type", get_merged_value(2)))
+                
+                html(cards.info_row_html("Quantity", get_merged_value(4)))
+                
+                # Row 2: Dimensions
+                dim1 = get_merged_value(5)
+                dim2 = get_merged_value(6)
+                dim3 = get_merged_value(7)
+                dims = f"{dim1} × {dim2} × {dim3} cm"
+                html(cards.info_row_html("Dimensions", dims))
+                
+                # Row 3: Voltage
+                html(cards.info_row_html("Voltage", get_merged_value(10)))
+                
+                # Row 4: Power
+                html(cards.info_row_html("Power", get_merged_value(11)))
+                
+                # Row 5: Status
+                html(cards.info_row_html("Status", get_merged_value(12)))
+                
+                html("</div>")
+            
+            with image_col:
+                html('<div class="image-section">')
+                html('<div class="info-label" style="margin-bottom: 0.75rem;">IMAGE</div>')
+                
+                image_url = get_merged_value(9)
+                converted_url = convert_google_drive_url(image_url)
+                
+                if converted_url:
+                    html('<div class="image-wrapper">')
+                    try:
+                        image(converted_url)
+                    except Exception as e:
+                        st.error(f"Image load error: {str(e)}")
+                        html(f"""
+                        <div style='padding: 1rem; background: #fff3cd; border-radius: 8px; border-left: 4px solid #FFD700;'>
+                            <p style='color: #856404; margin-bottom: 0.5rem; font-weight: 500;'>⚠️ Image cannot be displayed</p>
+                            <p style='color: #856404; font-size: 13px; margin-bottom: 0.5rem;'>Make sure the file is publicly shared in Google Drive</p>
+                            <a href='{image_url}' target='_blank' style='color: #FFD700; text-decoration: none; font-weight: 500;'>View Image in Google Drive →</a>
+                        </div>
+                        """)
+                    html('</div>')
+                else:
+                    html('<div style="padding: 2rem; background: #f8f8f8; border-radius: 8px; text-align: center; color: #999;">No image available</div>')
+                
+                html('</div>')
 
-credentials = load_credentials()
+def render_export_buttons(df, mask, asset_name_col, view_name):
+    """CSV/XLSX downloads of the rows in a view, written in chunks only when clicked"""
+    csv_col, xlsx_col, _ = st.columns([1, 1, 4])
+    with csv_col:
+        st.download_button(
+            "Export CSV",
+            data=lambda: export.export_file('csv', df, mask, asset_name_col),
+            file_name=f"{view_name}.csv",
+            mime="text/csv",
+            key=f"export_csv_{view_name}",
+            on_click="ignore"
+        )
+    with xlsx_col:
+        st.download_button(
+            "Export XLSX",
+            data=lambda: export.export_file('xlsx', df, mask, asset_name_col, view_name),
+            file_name=f"{view_name}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"export_xlsx_{view_name}",
+            on_click="ignore"
+        )
+
+def render_asset_grid(df, index, station_mask, highlight_mask, station_value, station_key, asset_name_col):
+    # Card grid view with Type tabs and Asset Name filter
+    # Create tabs for type filtering
+    type_options = ['Tools', 'Equipment']
+    type_tabs = st.tabs(type_options)
+    
+    for type_tab, type_option in zip(type_tabs, type_options):
+        with type_tab, perf.span(f"grid:{station_value}/{type_option}"):
+            # Filter by type
+            view_mask = station_mask & index.type_mask(type_option)
+            filtered = df[view_mask]
+            
+            # Asset name filter dropdown
+            asset_names = ['All'] + sorted(filtered[asset_name_col].unique().tolist())
+            selected_asset = st.selectbox("Filter by Asset Name", options=asset_names, key=f"filter_{station_value}_{type_option}")
+            
+            # Apply asset name filter on already type-filtered data
+            if selected_asset != 'All':
+                filtered = filtered[filtered[asset_name_col] == selected_asset]
+                view_mask = view_mask & (df[asset_name_col] == selected_asset).to_numpy()
+            
+            if not filtered.empty:
+                render_export_buttons(df, view_mask, asset_name_col, f"{station_key}_{type_option}")
+            
+            html("<div style='margin: 1.5rem 0;'></div>")
+            
+            if not filtered.empty:
+                asset_groups = asset_data.group_by_asset(filtered, asset_name_col)
+                changed_names = set(df[asset_name_col].to_numpy()[view_mask & highlight_mask])
+                
+                num_cols = 4
+                for i in range(0, len(asset_groups), num_cols):
+                    cols = st.columns(num_cols)
+                    batch = asset_groups[i:i + num_cols]
+                    
+                    for col_idx, (asset_name, group_df) in enumerate(batch):
+                        with cols[col_idx]:
+                            # Card and button
+                            count = len(group_df)
+                            safe_name = f"{station_key}_{type_option}_{i}_{col_idx}"
+                            
+                            # Dark cards, yellow when something changed since the last visit
+                            changed = asset_name in changed_names
+                            card_color = 'card-yellow' if changed else 'card-dark'
+                            
+                            # Create clickable card with colored header
+                            html(cards.asset_card_html(asset_name, count, card_color, note='updated' if changed else None))
+                            
+                            # Button positioned over the card by the overlay rules in the stylesheet
+                            if st.button(" ", key=f"card_{safe_name}_{asset_name}", use_container_width=True):
+                                st.session_state[f'modal_{station_key}'] = asset_name
+                                st.session_state[f'modal_data_{station_key}'] = group_df
+                                st.query_params["station"] = station_key
+                                st.query_params["asset"] = asset_name
+                                st.rerun()
+            else:
+                st.info("No assets found")
+
+def render_perf_panel():
+    """Hidden admin panel, opened with ?admin=perf"""
+    with st.expander("Performance", expanded=True):
+        summary = perf.stage_summary()
+        if summary:
+            st.dataframe(pd.DataFrame(summary), hide_index=True, use_container_width=True)
+        else:
+            st.info("No reruns recorded yet")
+
+        st.dataframe(pd.DataFrame(list(perf.counter_totals().items()), columns=["counter", "total"]), hide_index=True, use_container_width=True)
+
+        format_col, button_col, _ = st.columns([2, 2, 6])
+        with format_col:
+            export_format = st.selectbox("Format", options=["prometheus", "json"], key="perf_export_format")
+        with button_col:
+            # Served as a download so the panel never writes to the server's disk
+            st.download_button(
+                "Export metrics",
+                data=lambda: perf.metrics_text(export_format),
+                file_name="asset_metrics.prom" if export_format == "prometheus" else "asset_metrics.json",
+                mime="text/plain" if export_format == "prometheus" else "application/json",
+                key="perf_export",
+                on_click="ignore"
+            )
+
+        if st.button("Reset metrics", key="perf_reset"):
+            perf.reset()
+            st.rerun()
+
+# Main App
+try:
+    st.markdown('<div class="header-title">Commissary Assets</div>', unsafe_allow_html=True)
+    st.markdown('<div class="header-subtitle">List of assets in the commissary</div>', unsafe_allow_html=True)
 
-if credentials:
     sheet_url = "https://docs.google.com/spreadsheets/d/10GM76b6Y91ZfNelelaOvgXSLbqaPKHwfgMWN0x9Y42c"
-    
+
     with st.spinner("Loading data..."):
-        df = load_sheet_data(credentials, sheet_url, sheet_index=0)
-    
+        with perf.cached_call("load_sheet_data"):
+            df, version = load_sheet_data(sheet_url, sheet_index=0)
+
     if not df.empty:
-        df = df.drop(df.columns[0], axis=1)
-        
+        with perf.span("normalize"):
+            df = asset_data.normalize_frame(df)
+    
         station_col = df.columns[1]
         asset_name_col = df.columns[3]
-        
+    
+        with perf.cached_call("load_resolved_rows"):
+            resolved, row_hashes = load_resolved_rows(version, df, asset_name_col)
+    
+        history_store = load_history_store()
+        with perf.span("history_record"):
+            try:
+                history_store.record(resolved, version, hashes=row_hashes)
+            except OSError as e:
+                st.warning(f"Could not record asset history: {e}")
+    
+        change_feed = load_change_feed()
+        with perf.span("change_feed"):
+            change_feed.update(resolved, version, hashes=row_hashes)
+    
+        with perf.cached_call("load_facet_index"):
+            index = load_facet_index(version, resolved)
+    
+        with perf.span("facet_filter"):
+            selection_mask = index.mask(render_facet_filters(index))
+    
         stations = {
             'Hot Station': 'Hot Station',
             'Fabrication Station': 'Fabrication Station',
             'Pastry Station': 'Pastry Station',
             'Packing Station': 'Packing Station'
         }
-        
-        tabs = st.tabs(list(stations.keys()))
-        
+    
+        with perf.span("validation"):
+            report = load_validator(tuple(stations.values())).validate(df, version)
+        render_data_quality(report)
+    
+        changed_rows = render_change_feed(change_feed)
+        # Row keys line up with df rows, so this marks the rows to highlight
+        highlight_mask = row_hashes.index.isin(changed_rows['asset_number'])
+    
+        tabs = st.tabs(list(stations.keys()) + ['Overview', 'History'])
+    
         for tab, (tab_name, station_value) in zip(tabs, stations.items()):
             with tab:
-                station_df = df[df[station_col] == station_value]
-                
-                if not station_df.empty:
+                station_mask = index.masks['station'].get(station_value)
+            
+                if station_mask is not None:
                     station_key = station_value.replace(' ', '_')
-                    
+                
                     # --- Handle query params for modal persistence ---
                     query_params = st.query_params
-                    
+                
                     # If query params exist and match this station, ensure session state is set
                     if query_params.get("station") == station_key and "asset" in query_params:
                         asset_name = query_params["asset"]
@@ -667,222 +605,32 @@ if credentials:
                             del st.session_state[f'modal_{station_key}']
                         if f'modal_data_{station_key}' in st.session_state:
                             del st.session_state[f'modal_data_{station_key}']
-                    
+                
                     # Check if modal is open FOR THIS STATION
                     # Show modal if session state exists for this station
                     show_modal = f'modal_{station_key}' in st.session_state
-                    
+                
                     if show_modal:
-                        # Modal view
-                        st.markdown(f'<div class="modal-header">{st.session_state[f"modal_{station_key}"]} <span class="modal-count">({len(st.session_state[f"modal_data_{station_key}"])} items)</span></div>', unsafe_allow_html=True)
-                        
-                        # Back button with custom styling
-                        st.markdown('<div class="back-button-container">', unsafe_allow_html=True)
-                        if st.button("← Back to Assets", key=f"close_{station_key}"):
-                            # Clear both session state and query params
-                            if f'modal_{station_key}' in st.session_state:
-                                del st.session_state[f'modal_{station_key}']
-                            if f'modal_data_{station_key}' in st.session_state:
-                                del st.session_state[f'modal_data_{station_key}']
-                            st.query_params.clear()
-                            st.rerun()
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        st.markdown("<div style='margin: 1rem 0;'></div>", unsafe_allow_html=True)
-                        
-                        for idx, row in st.session_state[f'modal_data_{station_key}'].iterrows():
-                            asset_number = row.get(df.columns[0], 'N/A')
-                            
-                            with st.expander(asset_number):
-                                # Helper function to get value from merged cells
-                                def get_merged_value(column_index):
-                                    value = row.get(df.columns[column_index], "")
-                                    if not value or str(value).strip() == "":
-                                        # Look backwards through the dataframe to find the value
-                                        current_asset_name = row.get(asset_name_col, "")
-                                        for prev_idx in range(idx - 1, -1, -1):
-                                            try:
-                                                prev_row = st.session_state[f'modal_data_{station_key}'].iloc[prev_idx - st.session_state[f'modal_data_{station_key}'].index[0]]
-                                                if prev_row.get(asset_name_col, "") == current_asset_name:
-                                                    prev_value = prev_row.get(df.columns[column_index], "")
-                                                    if prev_value and str(prev_value).strip() != "":
-                                                        return prev_value
-                                                else:
-                                                    break
-                                            except:
-                                                break
-                                    return value if value else "N/A"
-                                
-                                # Create two main columns: info (80%) and image (20%)
-                                info_col, image_col = st.columns([8, 2])
-                                
-                                with info_col:
-                                    st.markdown("""
-                                    <div class="info-section">
-                                    """, unsafe_allow_html=True)
-                                    
-                                    # Row 1: Type and Quantity
-                                    st.markdown(f"""
-                                    <div class="info-row">
-                                        <div class="info-label">Type</div>
-                                        <div class="info-value">{get_merged_value(2)}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    st.markdown(f"""
-                                    <div class="info-row">
-                                        <div class="info-label">Quantity</div>
-                                        <div class="info-value">{get_merged_value(4)}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    # Row 2: Dimensions
-                                    dim1 = get_merged_value(5)
-                                    dim2 = get_merged_value(6)
-                                    dim3 = get_merged_value(7)
-                                    dims = f"{dim1} × {dim2} × {dim3} cm"
-                                    st.markdown(f"""
-                                    <div class="info-row">
-                                        <div class="info-label">Dimensions</div>
-                                        <div class="info-value">{dims}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    # Row 3: Voltage
-                                    st.markdown(f"""
-                                    <div class="info-row">
-                                        <div class="info-label">Voltage</div>
-                                        <div class="info-value">{get_merged_value(10)}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    # Row 4: Power
-                                    st.markdown(f"""
-                                    <div class="info-row">
-                                        <div class="info-label">Power</div>
-                                        <div class="info-value">{get_merged_value(11)}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    # Row 5: Status
-                                    st.markdown(f"""
-                                    <div class="info-row">
-                                        <div class="info-label">Status</div>
-                                        <div class="info-value">{get_merged_value(12)}</div>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                    
-                                    st.markdown("</div>", unsafe_allow_html=True)
-                                
-                                with image_col:
-                                    st.markdown('<div class="image-section">', unsafe_allow_html=True)
-                                    st.markdown('<div class="info-label" style="margin-bottom: 0.75rem;">IMAGE</div>', unsafe_allow_html=True)
-                                    
-                                    image_url = get_merged_value(9)
-                                    converted_url = convert_google_drive_url(image_url)
-                                    
-                                    if converted_url:
-                                        st.markdown('<div class="image-wrapper">', unsafe_allow_html=True)
-                                        try:
-                                            st.image(converted_url, use_container_width=True)
-                                        except Exception as e:
-                                            st.error(f"Image load error: {str(e)}")
-                                            st.markdown(f"""
-                                            <div style='padding: 1rem; background: #fff3cd; border-radius: 8px; border-left: 4px solid #FFD700;'>
-                                                <p style='color: #856404; margin-bottom: 0.5rem; font-weight: 500;'>⚠️ Image cannot be displayed</p>
-                                                <p style='color: #856404; font-size: 13px; margin-bottom: 0.5rem;'>Make sure the file is publicly shared in Google Drive</p>
-                                                <a href='{image_url}' target='_blank' style='color: #FFD700; text-decoration: none; font-weight: 500;'>View Image in Google Drive →</a>
-                                            </div>
-                                            """, unsafe_allow_html=True)
-                                        st.markdown('</div>', unsafe_allow_html=True)
-                                    else:
-                                        st.markdown('<div style="padding: 2rem; background: #f8f8f8; border-radius: 8px; text-align: center; color: #999;">No image available</div>', unsafe_allow_html=True)
-                                    
-                                    st.markdown('</div>', unsafe_allow_html=True)
+                        with perf.span(f"detail:{station_value}"):
+                            render_asset_details(df, station_key, asset_name_col)
                     else:
                         # Card grid view with Type tabs and Asset Name filter
-                        type_col = df.columns[2]  # Type column
-                        
-                        # Create tabs for type filtering
-                        type_options = ['Tools', 'Equipment']
-                        type_tabs = st.tabs(type_options)
-                        
-                        for type_tab, type_option in zip(type_tabs, type_options):
-                            with type_tab:
-                                # Filter by type
-                                filtered = station_df[station_df[type_col].str.contains(type_option, case=False, na=False)]
-                                
-                                # Asset name filter dropdown
-                                asset_names = ['All'] + sorted(filtered[asset_name_col].unique().tolist())
-                                selected_asset = st.selectbox("Filter by Asset Name", options=asset_names, key=f"filter_{station_value}_{type_option}")
-                                
-                                # Apply asset name filter on already type-filtered data
-                                if selected_asset != 'All':
-                                    filtered = filtered[filtered[asset_name_col] == selected_asset]
-                                
-                                st.markdown("<div style='margin: 1.5rem 0;'></div>", unsafe_allow_html=True)
-                                
-                                if not filtered.empty:
-                                    grouped = filtered.groupby(asset_name_col)
-                                    asset_groups = list(grouped)
-                                    
-                                    num_cols = 4
-                                    for i in range(0, len(asset_groups), num_cols):
-                                        cols = st.columns(num_cols)
-                                        batch = asset_groups[i:i + num_cols]
-                                        
-                                        for col_idx, (asset_name, group_df) in enumerate(batch):
-                                            with cols[col_idx]:
-                                                count = len(group_df)
-                                                safe_name = f"{station_key}_{type_option}_{i}_{col_idx}"
-                                                
-                                                # All cards use dark/black color
-                                                card_color = 'card-dark'
-                                                
-                                                # Create clickable card with black header
-                                                st.markdown(f"""
-                                                <div class="asset-card {card_color}">
-                                                    <div class="asset-card-header">
-                                                        <div class="asset-name">{asset_name}</div>
-                                                    </div>
-                                                    <div class="asset-card-body">
-                                                        <div class="asset-count">{count} items</div>
-                                                        <div class="asset-footer">View Details →</div>
-                                                    </div>
-                                                </div>
-                                                """, unsafe_allow_html=True)
-                                                
-                                                # Button positioned over the card
-                                                st.markdown("""
-                                                <style>
-                                                .element-container:has(> .stButton) {
-                                                    position: relative;
-                                                    margin-top: -200px;
-                                                    margin-bottom: 110px;
-                                                    z-index: 10;
-                                                }
-                                                .element-container:has(> .stButton) button {
-                                                    width: 100%;
-                                                    height: 200px;
-                                                    opacity: 0;
-                                                    cursor: pointer;
-                                                    margin: 0;
-                                                    padding: 0;
-                                                    background: transparent !important;
-                                                    border: none !important;
-                                                }
-                                                </style>
-                                                """, unsafe_allow_html=True)
-                                                
-                                                if st.button(" ", key=f"{safe_name}_{asset_name}", use_container_width=True):
-                                                    st.session_state[f'modal_{station_key}'] = asset_name
-                                                    st.session_state[f'modal_data_{station_key}'] = group_df
-                                                    st.query_params["station"] = station_key
-                                                    st.query_params["asset"] = asset_name
-                                                    st.rerun()
-                                else:
-                                    st.info("No assets found")
+                        render_asset_grid(df, index, station_mask & selection_mask, highlight_mask, station_value, station_key, asset_name_col)
+    
+        with tabs[-2], perf.span("rollups"):
+            rollup = load_rollup_store().get(version, resolved, row_hashes)
+            render_station_rollups(rollup, list(stations.values()))
+    
+        with tabs[-1]:
+            render_history(history_store)
     else:
         st.error("No data loaded")
-else:
-    st.error("Failed to load credentials")
+except BaseException:
+    # st.rerun() and errors end the script early; record those runs too
+    perf.end_rerun(interrupted=True)
+    raise
+
+perf.end_rerun()
+
+if st.query_params.get("admin") == "perf":
+    render_perf_panel()
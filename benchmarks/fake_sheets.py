@@ -0,0 +1,94 @@
+"""Synthetic worksheets and a stub gspread client for offline benchmarks"""
+import random
+import time
+
+STATIONS = ['Hot Station', 'Fabrication Station', 'Pastry Station', 'Packing Station']
+TYPES = ['Tools', 'Equipment']
+STATUSES = ['Working', 'Working', 'Working', 'Under Repair', 'For Disposal', 'Missing']
+VOLTAGES = ['110V', '220V', '220V', '380V']
+POWERS = ['500W', '750W', '1000W', '1500W', '2.2kW', '3kW', '1HP']
+ASSET_NAMES = [
+    'Chef Knife', 'Cutting Board', 'Stock Pot', 'Sheet Pan', 'Mixing Bowl', 'Ladle', 'Whisk',
+    'Convection Oven', 'Blast Chiller', 'Planetary Mixer', 'Vacuum Sealer', 'Deep Fryer',
+    'Induction Range', 'Dough Sheeter', 'Reach-in Chiller', 'Weighing Scale', 'Meat Slicer',
+]
+
+# Title row, two header rows (merged cells leave gaps in one of them), then data
+TITLE_ROW = ['', 'Commissary Asset Tagging'] + [''] * 12
+HEADER_ROW_1 = ['', 'Asset', 'Station', 'Type', 'Asset', '', 'Dimensions (cm)', '', '', 'Remarks', 'Image', 'Voltage', 'Power', 'Status']
+HEADER_ROW_2 = ['', 'No.', '', '', 'Name', 'Quantity', 'L', 'W', 'H', '', 'Link', '', '', '']
+
+
+def generate_values(num_rows, seed=0, max_group_size=6):
+    """Worksheet values shaped like the production sheet.
+
+    Each asset name spans a run of consecutive rows; only the first row of a
+    run carries the merged-cell values (quantity, dimensions, image, voltage,
+    power, status), the rest are left blank like in the real sheet.
+    """
+    rng = random.Random(seed)
+    rows = []
+    asset_number = 0
+    while len(rows) < num_rows:
+        station = rng.choice(STATIONS)
+        asset_type = rng.choice(TYPES)
+        name = rng.choice(ASSET_NAMES)
+        group_size = min(rng.randint(1, max_group_size), num_rows - len(rows))
+        electrical = asset_type == 'Equipment'
+        merged = [
+            str(group_size),
+            str(rng.randint(10, 200)), str(rng.randint(10, 200)), str(rng.randint(5, 150)),
+            '',
+            f"https://drive.google.com/file/d/{rng.getrandbits(64):016x}/view?usp=sharing",
+            rng.choice(VOLTAGES) if electrical else 'N/A',
+            rng.choice(POWERS) if electrical else 'N/A',
+            rng.choice(STATUSES),
+        ]
+        for i in range(group_size):
+            asset_number += 1
+            tail = merged if i == 0 else [''] * len(merged)
+            rows.append(['', f"CA-{asset_number:07d}", station, asset_type, name] + tail)
+    return [TITLE_ROW, HEADER_ROW_1, HEADER_ROW_2] + rows
+
+
+class FakeWorksheet:
+    def __init__(self, values, client):
+        self._values = values
+        self._client = client
+
+    def get_all_values(self):
+        self._client.simulate_latency(len(self._values))
+        return self._values
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets, client):
+        self._worksheets = worksheets
+        self._client = client
+
+    def get_worksheet(self, index):
+        return FakeWorksheet(self._worksheets[index], self._client)
+
+
+class FakeClient:
+    """Stands in for an authorized gspread client.
+
+    latency is a fixed per-request delay in seconds and per_row_latency models
+    transfer time for large sheets.
+    """
+
+    def __init__(self, worksheets, latency=0.0, per_row_latency=0.0):
+        self.worksheets = worksheets
+        self.latency = latency
+        self.per_row_latency = per_row_latency
+        self.requests = 0
+
+    def simulate_latency(self, num_rows):
+        self.requests += 1
+        delay = self.latency + self.per_row_latency * num_rows
+        if delay > 0:
+            time.sleep(delay)
+
+    def open_by_url(self, url):
+        self.simulate_latency(0)
+        return FakeSpreadsheet(self.worksheets, self)
@@ -0,0 +1,199 @@
+"""Drive many simulated sessions through assettagging.py with a fake Sheets backend.
+
+Each session is a Streamlit AppTest that loads the app, filters a station's
+asset grid, opens a card through the query params and goes back. Sessions run
+in threads inside one process, the same way a Streamlit server shares one
+interpreter between its tablets.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1 2 4 8 16 --rows 5000 --output load.json
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+from fake_sheets import FakeClient, generate_values
+from perf import percentile
+
+APP_PATH = os.path.join(ROOT, "assettagging.py")
+CREDENTIAL_FIELDS = [
+    "type", "project_id", "private_key_id", "private_key", "client_email", "client_id",
+    "auth_uri", "token_uri", "auth_provider_x509_cert_url", "client_x509_cert_url",
+]
+STATION_KEYS = ["Hot_Station", "Fabrication_Station", "Pastry_Station", "Packing_Station"]
+
+
+def new_session(timeout):
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["google_credentials"] = {field: "benchmark" for field in CREDENTIAL_FIELDS}
+    return at
+
+
+class Session:
+    """One simulated tablet, recording the latency of every rerun it triggers"""
+
+    def __init__(self, seed, timeout):
+        self.rng = random.Random(seed)
+        self.at = new_session(timeout)
+        self.latencies = []
+        self.errors = 0
+
+    def _run(self):
+        start = time.perf_counter()
+        self.at.run()
+        self.latencies.append(time.perf_counter() - start)
+        if self.at.exception:
+            self.errors += 1
+
+    def step(self):
+        at = self.at
+        if not self.latencies:
+            self._run()
+            return
+
+        # Switching station tabs is client-side in Streamlit, so a "visit" is
+        # an interaction with that station's grid
+        station_key = self.rng.choice(STATION_KEYS)
+        station_value = station_key.replace("_", " ")
+        filters = [s for s in at.selectbox if s.key and s.key.startswith(f"filter_{station_value}_")]
+        if filters:
+            selectbox = self.rng.choice(filters)
+            selectbox.select(self.rng.choice(selectbox.options))
+            self._run()
+            names = [o for o in selectbox.options if o != "All"]
+            if names:
+                at.query_params["station"] = station_key
+                at.query_params["asset"] = self.rng.choice(names)
+                self._run()
+                back = [b for b in at.button if b.key == f"close_{station_key}"]
+                if back:
+                    back[0].click()
+                else:
+                    at.query_params.clear()
+                self._run()
+        else:
+            self._run()
+
+
+def run_level(concurrency, steps, timeout, seed):
+    """Run concurrency sessions for steps interactions each; return the level's stats"""
+    sessions = [Session(seed + i, timeout) for i in range(concurrency)]
+
+    def drive(session):
+        for _ in range(steps):
+            session.step()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(drive, sessions))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(ms * 1000 for s in sessions for ms in s.latencies)
+    return sessions, {
+        "concurrency": concurrency,
+        "reruns": len(latencies),
+        "errors": sum(s.errors for s in sessions),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+    }
+
+
+def memory_per_session(count, timeout, seed):
+    """Average traced memory held by one loaded session, in KiB"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = [Session(seed + i, timeout) for i in range(count)]
+        for session in sessions:
+            session.step()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return round((after - before) / count / 1024, 1)
+
+
+def find_saturation(levels, min_gain):
+    """First concurrency level whose throughput gain over the previous one is below min_gain"""
+    for previous, current in zip(levels, levels[1:]):
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+            return previous["concurrency"]
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--steps", type=int, default=5, help="interactions per session")
+    parser.add_argument("--rows", type=int, default=5000, help="rows in the fake worksheet")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake Sheets request")
+    parser.add_argument("--memory-sessions", type=int, default=4, help="sessions used to estimate memory")
+    parser.add_argument("--min-gain", type=float, default=0.1, help="throughput gain below which a level counts as saturated")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Keep the sessions' history and snapshots out of the real stores
+    workdir = tempfile.mkdtemp(prefix="asset_load_test_")
+    os.environ["ASSET_HISTORY_DIR"] = os.path.join(workdir, "history")
+    os.environ["ASSET_CACHE_DIR"] = os.path.join(workdir, "cache")
+    client = FakeClient([generate_values(args.rows)], latency=args.latency)
+    with mock.patch("gspread.authorize", return_value=client), \
+            mock.patch("google.oauth2.service_account.Credentials.from_service_account_info", return_value=object()):
+        # Warm the shared caches so every level measures reruns, not the first fetch
+        new_session(args.timeout).run()
+
+        levels = []
+        for concurrency in args.concurrency:
+            _, stats = run_level(concurrency, args.steps, args.timeout, args.seed)
+            levels.append(stats)
+            print(
+                f"{concurrency:>4} sessions  {stats['throughput_rps']:>7.2f} reruns/s  "
+                f"p50={stats['p50_ms']:.0f}ms p95={stats['p95_ms']:.0f}ms p99={stats['p99_ms']:.0f}ms  "
+                f"errors={stats['errors']}",
+                flush=True,
+            )
+
+        memory_kib = memory_per_session(args.memory_sessions, args.timeout, args.seed)
+
+    saturation = find_saturation(levels, args.min_gain)
+    print(f"memory per session: {memory_kib} KiB")
+    print(f"throughput saturates at: {saturation if saturation else 'not reached'} sessions")
+
+    report = {
+        "rows": args.rows,
+        "latency": args.latency,
+        "steps": args.steps,
+        "levels": levels,
+        "memory_per_session_kib": memory_kib,
+        "saturation_concurrency": saturation,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
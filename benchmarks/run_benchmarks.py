@@ -0,0 +1,172 @@
+"""Time the asset pipeline stage by stage against synthetic worksheets.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import pandas as pd
+
+import asset_data
+import cards
+import facets
+from fake_sheets import STATIONS, TYPES, FakeClient, generate_values
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/benchmark"
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+# A typical multi-facet selection from the filter bar
+FACET_SELECTION = {'status': ['Working', 'Under Repair'], 'voltage': ['220V'], 'power': []}
+
+
+def facet_filter(index):
+    """Resolve the sample selection and its live counts, as on every rerun"""
+    selection_mask = index.mask(FACET_SELECTION)
+    index.counts(FACET_SELECTION)
+    return selection_mask
+
+
+def station_type_frames(df, index, selection_mask):
+    for station in STATIONS:
+        station_mask = index.masks['station'][station] & selection_mask
+        for type_option in TYPES:
+            yield df[station_mask & index.type_mask(type_option)]
+
+
+def render_cards(df, index, selection_mask, asset_name_col):
+    """Build the card markup for every station/type grid, like the app does"""
+    html = []
+    for filtered in station_type_frames(df, index, selection_mask):
+        for asset_name, group_df in asset_data.group_by_asset(filtered, asset_name_col):
+            html.append(cards.asset_card_html(asset_name, len(group_df)))
+    return html
+
+
+def filter_and_group(df, index, selection_mask, asset_name_col):
+    groups = 0
+    for filtered in station_type_frames(df, index, selection_mask):
+        groups += len(asset_data.group_by_asset(filtered, asset_name_col))
+    return groups
+
+
+def run_once(values, latency, per_row_latency):
+    """One pass through the pipeline, returning seconds per stage"""
+    timings = {}
+    client = FakeClient([values], latency=latency, per_row_latency=per_row_latency)
+
+    data, timings["load"] = _timed(asset_data.fetch_sheet_values, client, SHEET_URL, 0)
+    _, timings["combine_headers"] = _timed(asset_data.combine_headers, data[1], data[2])
+    raw_df, timings["build_frame"] = _timed(asset_data.frame_from_values, data)
+    df, timings["normalize"] = _timed(asset_data.normalize_frame, raw_df)
+
+    asset_name_col = df.columns[3]
+    resolved, timings["resolve"] = _timed(asset_data.resolve_rows, df, asset_name_col)
+    index, timings["facet_index"] = _timed(facets.FacetIndex, resolved)
+    selection_mask, timings["facet_filter"] = _timed(facet_filter, index)
+    _, timings["filter_group"] = _timed(filter_and_group, df, index, selection_mask, asset_name_col)
+    _, timings["html"] = _timed(render_cards, df, index, selection_mask, asset_name_col)
+    return timings
+
+
+def run_suite(sizes, repeat, latency, per_row_latency):
+    results = []
+    for size in sizes:
+        values = generate_values(size)
+        samples = {}
+        for _ in range(repeat):
+            for stage, seconds in run_once(values, latency, per_row_latency).items():
+                samples.setdefault(stage, []).append(seconds * 1000)
+        for stage, values_ms in samples.items():
+            results.append({
+                "rows": size,
+                "stage": stage,
+                "median_ms": round(statistics.median(values_ms), 3),
+                "min_ms": round(min(values_ms), 3),
+                "runs": len(values_ms),
+            })
+        print(f"{size:>9} rows  " + "  ".join(
+            f"{r['stage']}={r['median_ms']:.1f}ms" for r in results if r["rows"] == size
+        ), flush=True)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """Print stages that got slower than the baseline by more than threshold; return their count"""
+    previous = {(r["rows"], r["stage"]): r["median_ms"] for r in baseline["results"]}
+    regressions = 0
+    for r in current["results"]:
+        before = previous.get((r["rows"], r["stage"]))
+        if before is None or before <= 0:
+            continue
+        change = (r["median_ms"] - before) / before
+        marker = ""
+        # Sub-millisecond stages are too noisy to flag on a relative change alone
+        if change > threshold and r["median_ms"] - before > 0.5:
+            marker = "  REGRESSION"
+            regressions += 1
+        print(f"{r['rows']:>9} {r['stage']:<16} {before:>10.2f} -> {r['median_ms']:>10.2f} ms ({change:+.0%}){marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake Sheets request")
+    parser.add_argument("--per-row-latency", type=float, default=0.0, help="extra seconds per fetched row")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    report = {
+        "revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "latency": args.latency,
+        "per_row_latency": args.per_row_latency,
+        "results": run_suite(args.sizes, args.repeat, args.latency, args.per_row_latency),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
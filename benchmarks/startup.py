@@ -0,0 +1,143 @@
+"""Measure cold start and per-rerun payload of assettagging.py, and check them against budgets.
+
+Each measurement runs in a fresh interpreter so module imports are counted:
+
+  live      first run of a new process that has to fetch from (fake) Sheets
+  snapshot  first run of a new process when a recent local snapshot exists;
+            the Google client libraries must not be imported at all
+  payload   bytes of the element messages sent on a warm rerun
+
+Usage:
+    python benchmarks/startup.py                 # print the numbers
+    python benchmarks/startup.py --check         # exit 1 if a budget is exceeded
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, os.pardir)
+
+# Budgets for --check
+MAX_SNAPSHOT_FIRST_RUN_S = 3.0
+MAX_RERUN_PAYLOAD_BYTES = 75_000
+GOOGLE_MODULES = ("gspread", "google.oauth2", "google.auth")
+
+
+def _payload_bytes(node):
+    total = 0
+    proto = getattr(node, "proto", None)
+    if proto is not None and hasattr(proto, "ByteSize"):
+        total += proto.ByteSize()
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            total += _payload_bytes(child)
+    return total
+
+
+def child(mode, rows):
+    """Runs in the measured interpreter; prints one JSON line"""
+    import time
+    start = time.perf_counter()
+
+    sys.path.insert(0, HERE)
+    from unittest import mock
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(ROOT, "assettagging.py")
+    at = AppTest.from_file(app_path, default_timeout=120)
+
+    if mode == "snapshot":
+        # No secrets and no fake client: any live fetch would fail here
+        run_start = time.perf_counter()
+        at.run()
+        first_run = time.perf_counter() - run_start
+    else:
+        from fake_sheets import FakeClient, generate_values
+        from load_test import CREDENTIAL_FIELDS
+        at.secrets["google_credentials"] = {field: "benchmark" for field in CREDENTIAL_FIELDS}
+        client = FakeClient([generate_values(rows)])
+        with mock.patch("gspread.authorize", return_value=client), \
+                mock.patch("google.oauth2.service_account.Credentials.from_service_account_info", return_value=object()):
+            run_start = time.perf_counter()
+            at.run()
+            first_run = time.perf_counter() - run_start
+            at.run()
+
+    print(json.dumps({
+        "mode": mode,
+        "first_run_s": round(first_run, 3),
+        "process_to_first_paint_s": round(time.perf_counter() - start, 3),
+        "payload_bytes": _payload_bytes(at._tree),
+        "errors": [e.value for e in at.error] + [str(e.value) for e in at.exception],
+        "google_imported": sorted(m for m in GOOGLE_MODULES if m in sys.modules),
+    }))
+
+
+def measure(mode, rows, env):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--rows", str(rows)],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode or not lines:
+        raise RuntimeError(f"{mode} run failed:\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--check", action="store_true", help="fail when a budget is exceeded")
+    parser.add_argument("--output", help="write the measurements to this JSON file")
+    parser.add_argument("--child", choices=["live", "snapshot"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.rows)
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix="asset_startup_")
+    env = dict(
+        os.environ,
+        ASSET_HISTORY_DIR=os.path.join(workdir, "history"),
+        ASSET_CACHE_DIR=os.path.join(workdir, "cache"),
+    )
+    live = measure("live", args.rows, env)
+    snapshot = measure("snapshot", args.rows, env)
+
+    for result in (live, snapshot):
+        print(
+            f"{result['mode']:<9} first run {result['first_run_s']:.2f}s  "
+            f"process to first paint {result['process_to_first_paint_s']:.2f}s  "
+            f"rerun payload {result['payload_bytes']:,} B  "
+            f"google modules: {', '.join(result['google_imported']) or 'none'}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"live": live, "snapshot": snapshot}, f, indent=2)
+
+    if not args.check:
+        return 0
+
+    failures = []
+    if snapshot["errors"]:
+        failures.append(f"snapshot start showed errors: {snapshot['errors']}")
+    if snapshot["google_imported"]:
+        failures.append(f"snapshot start imported {', '.join(snapshot['google_imported'])}")
+    if snapshot["first_run_s"] > MAX_SNAPSHOT_FIRST_RUN_S:
+        failures.append(f"snapshot first run took {snapshot['first_run_s']}s (budget {MAX_SNAPSHOT_FIRST_RUN_S}s)")
+    if live["payload_bytes"] > MAX_RERUN_PAYLOAD_BYTES:
+        failures.append(f"rerun payload is {live['payload_bytes']:,} B (budget {MAX_RERUN_PAYLOAD_BYTES:,} B)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+# Markup is kept on one line: it is re-sent for every card on every rerun
+
+
+def asset_card_html(asset_name, count, card_color='card-dark', note=None):
+    """Markup for a clickable asset card in the station grid"""
+    count_text = f"{count} items · {note}" if note else f"{count} items"
+    return (
+        f'<div class="asset-card {card_color}">'
+        f'<div class="asset-card-header"><div class="asset-name">{asset_name}</div></div>'
+        f'<div class="asset-card-body"><div class="asset-count">{count_text}</div>'
+        f'<div class="asset-footer">View Details →</div></div>'
+        f'</div>'
+    )
+
+
+def info_row_html(label, value):
+    """Markup for a label/value row in the asset details view"""
+    return (
+        f'<div class="info-row"><div class="info-label">{label}</div>'
+        f'<div class="info-value">{value}</div></div>'
+    )
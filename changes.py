@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import asset_data
+
+# Change sets kept in memory; sessions that fell further behind see these only
+MAX_CHANGE_SETS = 20
+
+FEED_COLUMNS = ['asset_number', 'asset_name', 'station', 'change']
+
+
+def _row_info(df, keys, wanted):
+    """Asset name, station and status for the wanted keys only, looked up by position"""
+    rows = df.iloc[keys.get_indexer(wanted)]
+    status = rows.iloc[:, asset_data.STATUS_COL].astype(str).str.strip()
+    return pd.DataFrame({
+        'asset_name': rows.iloc[:, asset_data.ASSET_NAME_COL].to_numpy(),
+        'station': rows.iloc[:, asset_data.STATION_COL].to_numpy(),
+        'status': status.mask(status == '', 'N/A').to_numpy(),
+    }, index=wanted)
+
+
+class ChangeFeed:
+    """Row-level change sets between data versions, keyed on asset number, in a bounded ring buffer"""
+
+    def __init__(self, max_change_sets=MAX_CHANGE_SETS):
+        self._lock = threading.Lock()
+        self.change_sets = deque(maxlen=max_change_sets)
+        self.version = None
+        self._hashes = None
+        self._frame = None
+
+    def update(self, df, version, hashes=None):
+        """Record what changed since the previous version; a no-op for the current one.
+
+        df should have its merged cells filled in (asset_data.resolve_rows), so a
+        group's status change shows up on every asset in the group. Pass its
+        row hashes when they are already computed.
+        """
+        with self._lock:
+            if version == self.version:
+                return
+            if hashes is None:
+                hashes = asset_data.row_hashes(df, df.columns[0])
+
+            if self._hashes is not None:
+                # Only the differing keys are looked up from here on
+                added, removed, changed = asset_data.diff_hashes(self._hashes, hashes)
+                if len(added) or len(removed) or len(changed):
+                    new_info = _row_info(df, hashes.index, added.append(changed))
+                    old_info = _row_info(self._frame, self._hashes.index, removed.append(changed))
+                    old_status = old_info['status'].to_numpy()[len(removed):]
+                    new_status = new_info['status'].to_numpy()[len(added):]
+                    status_changed = old_status != new_status
+                    change = np.full(len(changed), 'updated', dtype=object)
+                    change[status_changed] = [
+                        f"status: {old} → {new}"
+                        for old, new in zip(old_status[status_changed], new_status[status_changed])
+                    ]
+
+                    rows = pd.concat([
+                        new_info.iloc[:len(added)].assign(change='added'),
+                        new_info.iloc[len(added):].assign(change=change),
+                        old_info.iloc[:len(removed)].assign(change='removed'),
+                    ]).rename_axis('asset_number').reset_index()[FEED_COLUMNS]
+                else:
+                    rows = pd.DataFrame(columns=FEED_COLUMNS)
+
+                # Recorded even when empty (a raw-only edit) so the from/to chain
+                # stays unbroken for sessions that have seen the previous version
+                self.change_sets.append({
+                    'from': self.version,
+                    'to': version,
+                    'timestamp': time.time(),
+                    'added': len(added),
+                    'removed': len(removed),
+                    'changed': len(changed),
+                    'rows': rows,
+                })
+
+            self.version, self._hashes, self._frame = version, hashes, df
+
+    def since(self, last_seen):
+        """Change sets newer than last_seen, oldest first, and whether older ones were dropped"""
+        with self._lock:
+            change_sets = list(self.change_sets)
+        if last_seen == self.version:
+            return [], False
+        for i, change_set in enumerate(change_sets):
+            if change_set['from'] == last_seen:
+                return change_sets[i:], False
+        return change_sets, True
+
+    def changed_rows(self, last_seen):
+        """Net changes since last_seen, one row per asset number, newest change winning"""
+        change_sets, truncated = self.since(last_seen)
+        if not change_sets:
+            return pd.DataFrame(columns=FEED_COLUMNS), truncated
+        rows = pd.concat([c['rows'] for c in change_sets], ignore_index=True)
+        return rows.drop_duplicates('asset_number', keep='last').reset_index(drop=True), truncated
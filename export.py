@@ -0,0 +1,70 @@
+import io
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import asset_data
+
+# Rows resolved and written per step, which bounds the memory an export needs
+CHUNK_ROWS = 5000
+
+
+def iter_resolved_chunks(df, mask, asset_name_col, chunk_rows=CHUNK_ROWS):
+    """Selected rows of df in sheet order, chunk by chunk, with merged cells filled in.
+
+    Merged values can come from rows that are not selected (or sit in the
+    previous chunk), so every chunk is resolved in full, starting from the
+    last resolved row of the chunk before it.
+    """
+    merged = [df.columns[position] for position in asset_data.MERGED_COLS if position < len(df.columns)]
+    carry = None
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk])
+        chunk = chunk.copy()
+        chunk[merged] = asset_data.resolve_merged(chunk, asset_name_col, merged, blank='')
+        if carry is not None:
+            chunk = chunk.iloc[1:]
+        carry = chunk.iloc[-1:]
+
+        chunk_mask = mask[start:start + chunk_rows]
+        if chunk_mask.any():
+            yield chunk[chunk_mask]
+
+
+def write_csv(df, mask, asset_name_col, out):
+    """Stream the selected rows to a binary file object as UTF-8 CSV"""
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='', write_through=True)
+    df.iloc[:0].to_csv(text, index=False, lineterminator='\r\n')
+    for chunk in iter_resolved_chunks(df, mask, asset_name_col):
+        chunk.to_csv(text, header=False, index=False, lineterminator='\r\n')
+    text.detach()
+
+
+def write_xlsx(df, mask, asset_name_col, out, sheet_title='Assets'):
+    """Stream the selected rows to a binary file object as an XLSX workbook (openpyxl write-only mode)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title=sheet_title[:31])
+    worksheet.append([str(c) for c in df.columns])
+    for chunk in iter_resolved_chunks(df, mask, asset_name_col):
+        for row in chunk.itertuples(index=False, name=None):
+            worksheet.append(row)
+    workbook.save(out)
+
+
+def export_file(fmt, df, mask, asset_name_col, sheet_title='Assets'):
+    """Selected rows written to an anonymous temporary file, rewound for reading"""
+    mask = np.asarray(mask, dtype=bool)
+    out = tempfile.TemporaryFile()
+    if fmt == 'csv':
+        write_csv(df, mask, asset_name_col, out)
+    elif fmt == 'xlsx':
+        write_xlsx(df, mask, asset_name_col, out, sheet_title)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    out.seek(0)
+    return out
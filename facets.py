@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+import asset_data
+
+# Column position of each facet in the normalized frame
+FACET_COLUMNS = {
+    'station': asset_data.STATION_COL,
+    'type': asset_data.TYPE_COL,
+    'voltage': asset_data.VOLTAGE_COL,
+    'power': asset_data.POWER_COL,
+    'status': asset_data.STATUS_COL,
+}
+
+
+class FacetIndex:
+    """Boolean-array index per facet value, so any selection is a few vectorized ANDs/ORs"""
+
+    def __init__(self, df, facet_columns=None):
+        """df has its merged cells filled in (asset_data.resolve_rows)"""
+        facet_columns = facet_columns or FACET_COLUMNS
+        self.size = len(df)
+        self.labels = {}
+        self.codes = {}
+        self.masks = {}
+
+        for facet, position in facet_columns.items():
+            values = df.iloc[:, position].astype(str).str.strip()
+            codes, uniques = pd.factorize(values.mask(values == '', 'N/A'), sort=True)
+            self.codes[facet] = codes
+            self.labels[facet] = list(uniques)
+            self.masks[facet] = {label: codes == i for i, label in enumerate(uniques)}
+
+    def _facet_mask(self, facet, labels):
+        # OR within a facet
+        facet_mask = np.zeros(self.size, dtype=bool)
+        for label in labels:
+            value_mask = self.masks[facet].get(label)
+            if value_mask is not None:
+                facet_mask |= value_mask
+        return facet_mask
+
+    def mask(self, selections):
+        """Rows matching every facet in selections ({facet: [labels]}); an empty list means no filter"""
+        result = np.ones(self.size, dtype=bool)
+        for facet, labels in selections.items():
+            if labels:
+                result &= self._facet_mask(facet, labels)
+        return result
+
+    def type_mask(self, type_option):
+        """Rows whose type contains type_option, case-insensitively, like the type tabs"""
+        labels = [label for label in self.labels['type'] if type_option.lower() in label.lower()]
+        return self._facet_mask('type', labels)
+
+    def counts(self, selections):
+        """Live counts per facet value, each facet counted under the other facets' selections"""
+        facet_masks = {facet: self._facet_mask(facet, labels) for facet, labels in selections.items() if labels}
+        counts = {}
+        for facet, codes in self.codes.items():
+            others = np.ones(self.size, dtype=bool)
+            for other, other_mask in facet_masks.items():
+                if other != facet:
+                    others &= other_mask
+            tally = np.bincount(codes[others], minlength=len(self.labels[facet]))
+            counts[facet] = dict(zip(self.labels[facet], tally.tolist()))
+        return counts
@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import asset_data
+
+HISTORY_DIR = os.environ.get(
+    "ASSET_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".asset_history")
+)
+# A full checkpoint is written once the deltas since the last one add up to
+# this share of the table, so disk use follows the number of edits
+CHECKPOINT_CHANGE_RATIO = 0.5
+# ...or after this many deltas, to bound the replay for point-in-time queries
+MAX_DELTAS_PER_CHECKPOINT = 50
+
+KEY_COL = "_key"
+OP_COL = "_op"
+# Sort key that puts rebuilt rows back in sheet order
+POS_COL = "_pos"
+
+
+@lru_cache(maxsize=4)
+def _read_checkpoint(path):
+    return pd.read_parquet(path).set_index(KEY_COL)
+
+
+def _sheet_positions(keys, unchanged, previous_pos):
+    """Sort keys for the rows of a new version, or None when they have to be renumbered.
+
+    Unchanged rows keep the key already stored for them, so they need no
+    rewrite; added and changed rows get keys between their neighbours. None
+    means that is not possible: rows were moved, or a gap ran out of float
+    precision.
+    """
+    pos = previous_pos.reindex(keys).to_numpy(dtype=float, copy=True)
+    pos[~unchanged] = np.nan
+    known = np.flatnonzero(~np.isnan(pos))
+    if not len(known):
+        return None
+    rows = np.arange(len(keys))
+    filled = np.interp(rows, known, pos[known])
+    before, after = rows < known[0], rows > known[-1]
+    filled[before] = pos[known[0]] - (known[0] - rows[before])
+    filled[after] = pos[known[-1]] + (rows[after] - known[-1])
+    if not (np.diff(filled) > 0).all():
+        return None
+    return filled
+
+
+class HistoryStore:
+    """Append-only history of synced versions: keyed row deltas plus periodic full checkpoints.
+
+    Every version writes a delta file with the rows that were added, removed
+    or changed (removed rows keep their last values). A version is rebuilt
+    from the nearest checkpoint at or before it plus the deltas after that.
+
+    Record tables with merged cells filled in (asset_data.resolve_rows): an
+    edit to a merged cell such as a group's status then changes, and is
+    recorded for, every asset in the group rather than only the first row.
+    """
+
+    def __init__(self, path=HISTORY_DIR):
+        self.path = path
+        self._lock = threading.Lock()
+        self._manifest_path = os.path.join(path, "manifest.json")
+        self._index_path = os.path.join(path, "asset_index.jsonl")
+        self.versions = []
+        self.asset_index = {}
+        self._latest = None
+        self._latest_hashes = None
+
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, encoding="utf-8") as f:
+                self.versions = json.load(f)["versions"]
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    for key in entry["keys"]:
+                        self.asset_index.setdefault(key, []).append(entry["seq"])
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"versions": self.versions}, f)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _latest_state(self):
+        if self._latest is None and self.versions:
+            frame = self._rebuild(len(self.versions) - 1)
+            self._latest = frame
+            hashes = pd.util.hash_pandas_object(frame.drop(columns=POS_COL), index=False)
+            self._latest_hashes = pd.Series(hashes.to_numpy(), index=frame.index)
+        return self._latest, self._latest_hashes
+
+    def record(self, df, version, timestamp=None, hashes=None):
+        """Store df as a new version unless it is already the latest; returns the change counts"""
+        with self._lock:
+            if self.versions and self.versions[-1]["version"] == version:
+                return None
+
+            if hashes is None:
+                hashes = asset_data.row_hashes(df, df.columns[0])
+            keyed = df.set_axis(hashes.index, axis=0)
+            previous, previous_hashes = self._latest_state()
+
+            # A new column layout starts a fresh chain from a checkpoint
+            new_chain = previous is None or list(previous.columns.drop(POS_COL)) != list(df.columns)
+            positions = None
+            if new_chain:
+                added, removed, changed = hashes.index, pd.Index([]), pd.Index([])
+            else:
+                added, removed, changed = asset_data.diff_hashes(previous_hashes, hashes)
+                if not (len(added) or len(removed) or len(changed)):
+                    return None
+                unchanged = ~hashes.index.isin(added.append(changed))
+                positions = _sheet_positions(hashes.index, unchanged, previous[POS_COL])
+            # Renumbered rows are only all on disk in a checkpoint
+            renumbered = positions is None
+            if renumbered:
+                positions = np.arange(len(df), dtype=float)
+            keyed = keyed.assign(**{POS_COL: positions})
+
+            os.makedirs(self.path, exist_ok=True)
+            seq = self.versions[-1]["seq"] + 1 if self.versions else 0
+
+            delta = pd.concat([
+                keyed.loc[added].assign(**{OP_COL: "added"}),
+                keyed.loc[changed].assign(**{OP_COL: "changed"}),
+                previous.loc[removed].assign(**{OP_COL: "removed"}) if len(removed) else None,
+            ])
+            delta_file = f"delta-{seq:06d}.parquet"
+            delta.rename_axis(KEY_COL).reset_index().to_parquet(self._file(delta_file), index=False, compression="zstd")
+
+            since = self.versions[self._checkpoint_position(len(self.versions) - 1) + 1:] if self.versions else []
+            pending_rows = sum(v["rows_changed"] for v in since) + len(delta)
+            checkpoint_file = None
+            if (renumbered
+                    or pending_rows >= CHECKPOINT_CHANGE_RATIO * max(len(df), 1)
+                    or len(since) >= MAX_DELTAS_PER_CHECKPOINT):
+                checkpoint_file = f"checkpoint-{seq:06d}.parquet"
+                keyed.rename_axis(KEY_COL).reset_index().to_parquet(self._file(checkpoint_file), index=False, compression="zstd")
+
+            entry = {
+                "seq": seq,
+                "version": version,
+                "timestamp": timestamp if timestamp is not None else time.time(),
+                "delta": delta_file,
+                "checkpoint": checkpoint_file,
+                "added": len(added),
+                "removed": len(removed),
+                "changed": len(changed),
+                "rows_changed": len(delta),
+            }
+            changed_keys = [str(k) for k in delta.index]
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"seq": seq, "keys": changed_keys}) + "\n")
+            for key in changed_keys:
+                self.asset_index.setdefault(key, []).append(seq)
+            self.versions.append(entry)
+            self._write_manifest()
+
+            self._latest = keyed
+            self._latest_hashes = hashes
+            return {"added": len(added), "removed": len(removed), "changed": len(changed)}
+
+    def _checkpoint_position(self, position):
+        for i in range(position, -1, -1):
+            if self.versions[i]["checkpoint"]:
+                return i
+        raise ValueError("History has no checkpoint")
+
+    def _rebuild(self, position):
+        start = self._checkpoint_position(position)
+        frame = _read_checkpoint(self._file(self.versions[start]["checkpoint"]))
+        if POS_COL not in frame.columns:
+            # Recorded before sort keys were stored; checkpoints are in sheet order
+            frame = frame.assign(**{POS_COL: np.arange(len(frame), dtype=float)})
+        if start == position:
+            return frame
+
+        files = [self._file(v["delta"]) for v in self.versions[start + 1:position + 1]]
+        deltas = pd.concat([pd.read_parquet(path) for path in files]).drop_duplicates(KEY_COL, keep="last")
+        deltas = deltas.set_index(KEY_COL)
+        kept = frame[~frame.index.isin(deltas.index)]
+        upserts = deltas.loc[deltas[OP_COL] != "removed"].reindex(columns=frame.columns)
+        return pd.concat([kept, upserts]).sort_values(POS_COL, kind="stable", na_position="last")
+
+    def as_of(self, when):
+        """Inventory as it was at timestamp when (seconds since the epoch), or None before the first sync"""
+        timestamps = [v["timestamp"] for v in self.versions]
+        position = pd.Index(timestamps).searchsorted(when, side="right") - 1
+        if position < 0:
+            return None
+        with self._lock:
+            return self._rebuild(position).drop(columns=POS_COL).reset_index(drop=True)
+
+    def asset_history(self, asset_number):
+        """Every recorded change to asset_number, oldest first, read only from the deltas that touched it"""
+        asset_number = str(asset_number).strip()
+        # Repeated asset numbers are keyed N, N#1, N#2, ...
+        keys = []
+        key = asset_number
+        while key in self.asset_index:
+            keys.append(key)
+            key = f"{asset_number}#{len(keys)}"
+        seqs = sorted({seq for key in keys for seq in self.asset_index[key]})
+        if not seqs:
+            return pd.DataFrame()
+
+        by_seq = {v["seq"]: v for v in self.versions}
+        frames = []
+        for seq in seqs:
+            entry = by_seq[seq]
+            frame = pd.read_parquet(self._file(entry["delta"]), filters=[(KEY_COL, "in", keys)])
+            frame = frame.drop(columns=POS_COL, errors="ignore")
+            frame.insert(0, "timestamp", pd.to_datetime(entry["timestamp"], unit="s"))
+            frame.insert(0, "version", seq)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
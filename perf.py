@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+# Number of recent reruns kept for percentile reporting
+HISTORY_SIZE = 200
+
+_lock = threading.Lock()
+_reruns = deque(maxlen=HISTORY_SIZE)
+_totals = defaultdict(int)
+# Streamlit runs each session's script on its own thread
+_local = threading.local()
+
+
+def begin_rerun():
+    """Start collecting spans and counters for the current script run"""
+    _local.current = {
+        "started": time.time(),
+        "clock": time.perf_counter(),
+        "timings": defaultdict(float),
+        "counters": defaultdict(int),
+    }
+
+
+def end_rerun(interrupted=False):
+    """Close the current script run and add it to the recent history.
+
+    interrupted marks a run cut short by st.rerun() or an exception.
+    """
+    current = getattr(_local, "current", None)
+    if current is None:
+        return
+    if interrupted:
+        incr("interrupted_reruns")
+    _local.current = None
+    current["timings"]["rerun"] = time.perf_counter() - current["clock"]
+    record = {
+        "started": current["started"],
+        "interrupted": interrupted,
+        "timings": dict(current["timings"]),
+        "counters": dict(current["counters"]),
+    }
+    with _lock:
+        _reruns.append(record)
+
+
+def record_timing(name, seconds):
+    current = getattr(_local, "current", None)
+    if current is not None:
+        current["timings"][name] += seconds
+
+
+@contextmanager
+def span(name):
+    """Time the wrapped block and add it to the stage total for this rerun"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def incr(name, n=1):
+    with _lock:
+        _totals[name] += n
+    current = getattr(_local, "current", None)
+    if current is not None:
+        current["counters"][name] += n
+
+
+def counter(name):
+    """Value of a counter within the current rerun"""
+    current = getattr(_local, "current", None)
+    if current is None:
+        return 0
+    return current["counters"].get(name, 0)
+
+
+def cache_miss(name):
+    """Call from inside a cached function body, which only runs on a miss"""
+    incr(f"{name}_cache_misses")
+
+
+@contextmanager
+def cached_call(name):
+    """Time a call to a cached function and count a hit when its body did not run"""
+    misses = counter(f"{name}_cache_misses")
+    with span(name):
+        yield
+    if counter(f"{name}_cache_misses") == misses:
+        incr(f"{name}_cache_hits")
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def stage_summary():
+    """p50/p95 per stage across the recent reruns, in milliseconds"""
+    with _lock:
+        reruns = list(_reruns)
+
+    samples = defaultdict(list)
+    for record in reruns:
+        for stage, seconds in record["timings"].items():
+            samples[stage].append(seconds * 1000)
+
+    summary = []
+    for stage in sorted(samples):
+        values = sorted(samples[stage])
+        summary.append({
+            "stage": stage,
+            "samples": len(values),
+            "p50_ms": round(percentile(values, 0.50), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "max_ms": round(values[-1], 3),
+        })
+    return summary
+
+
+def counter_totals():
+    with _lock:
+        return dict(sorted(_totals.items()))
+
+
+def reset():
+    with _lock:
+        _reruns.clear()
+        _totals.clear()
+
+
+def metrics_json():
+    return json.dumps({
+        "generated": time.time(),
+        "stages": stage_summary(),
+        "counters": counter_totals(),
+    }, indent=2)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def metrics_prometheus():
+    """Render stage percentiles and counters in the Prometheus text format"""
+    lines = [
+        "# HELP assettagging_stage_seconds Time spent per stage of a rerun.",
+        "# TYPE assettagging_stage_seconds summary",
+    ]
+    for row in stage_summary():
+        stage = _label(row["stage"])
+        lines.append(f'assettagging_stage_seconds{{stage="{stage}",quantile="0.5"}} {row["p50_ms"] / 1000:.6f}')
+        lines.append(f'assettagging_stage_seconds{{stage="{stage}",quantile="0.95"}} {row["p95_ms"] / 1000:.6f}')
+        lines.append(f'assettagging_stage_seconds_count{{stage="{stage}"}} {row["samples"]}')
+
+    lines.append("# HELP assettagging_events_total Cache hits, misses and emitted elements.")
+    lines.append("# TYPE assettagging_events_total counter")
+    for name, value in counter_totals().items():
+        lines.append(f'assettagging_events_total{{name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def metrics_text(fmt="json"):
+    """The current metrics as "json" or "prometheus" text, for download"""
+    if fmt == "json":
+        return metrics_json()
+    if fmt == "prometheus":
+        return metrics_prometheus()
+    raise ValueError(f"Unknown metrics format: {fmt}")
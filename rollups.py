@@ -0,0 +1,134 @@
+import re
+import threading
+
+import pandas as pd
+
+import asset_data
+
+POWER_UNITS = {'w': 1.0, 'kw': 1000.0, 'hp': 746.0}
+# The whole cell must be one rating: "5A", "2kVA" or "220V" are not watts
+POWER_PATTERN = r'^\s*(\d[\d,]*\.?\d*)\s*(kw|w|hp|a)?\s*$'
+VOLTAGE_PATTERN = r'^\s*(\d[\d,]*\.?\d*)\s*v\s*$'
+
+
+def _extract(values, pattern):
+    # Ratings repeat a lot, so parse each distinct string once
+    codes, uniques = pd.factorize(values.astype(str))
+    parts = pd.Series(uniques).str.extract(pattern, flags=re.IGNORECASE)
+    parts[0] = pd.to_numeric(parts[0].str.replace(',', '', regex=False), errors='coerce')
+    return parts.iloc[codes].set_axis(values.index)
+
+
+def parse_power_watts(values, voltage=None):
+    """Rated power in watts from strings like "1500W", "2.2 kW" or "1HP"; NaN when unparseable.
+
+    Amp ratings ("5A") are converted with the row's voltage ("220V") when it
+    is given and parses, and are NaN otherwise.
+    """
+    parts = _extract(values, POWER_PATTERN)
+    unit = parts[1].str.lower().fillna('w')
+    watts = parts[0] * unit.map(POWER_UNITS)
+    if voltage is not None:
+        volts = _extract(voltage, VOLTAGE_PATTERN)[0]
+        watts = watts.mask(unit == 'a', parts[0] * volts)
+    return watts
+
+
+def _label(values):
+    values = values.astype(str).str.strip()
+    return values.mask(values.isin(['', 'N/A']), 'N/A').to_numpy()
+
+
+def rollup_rows(df, keys):
+    """What each row of df (merged cells filled in) contributes to the rollups, indexed by keys"""
+    power = df.iloc[:, asset_data.POWER_COL].astype(str).str.strip()
+    watts = parse_power_watts(power, df.iloc[:, asset_data.VOLTAGE_COL])
+
+    return pd.DataFrame({
+        'station': df.iloc[:, asset_data.STATION_COL].astype(str).str.strip().to_numpy(),
+        'type': _label(df.iloc[:, asset_data.TYPE_COL]),
+        'status': _label(df.iloc[:, asset_data.STATUS_COL]),
+        'watts': watts.fillna(0.0).to_numpy(),
+        # A rating was given but could not be read as watts
+        'unparsed': (watts.isna() & ~power.isin(['', 'N/A'])).to_numpy(),
+    }, index=keys)
+
+
+def _tally(rows):
+    return {
+        'units': rows.groupby('station').size(),
+        'status': rows.groupby(['station', 'status']).size().unstack(fill_value=0),
+        'type': rows.groupby(['station', 'type']).size().unstack(fill_value=0),
+        'watts': rows.groupby('station')['watts'].sum(),
+        'unparsed': rows.groupby('station')['unparsed'].sum(),
+    }
+
+
+def _combine(current, delta, sign):
+    combined = current.add(sign * delta, fill_value=0).fillna(0)
+    if isinstance(combined, pd.DataFrame):
+        combined = combined.loc[(combined != 0).any(axis=1), (combined != 0).any(axis=0)]
+        return combined.astype(int)
+    return combined[combined != 0]
+
+
+class StationRollup:
+    """Per-station unit counts by status and type, total rated power and unreadable ratings"""
+
+    def __init__(self, aggregates):
+        self.units = aggregates['units'].astype(int)
+        self.status_counts = aggregates['status']
+        self.type_counts = aggregates['type']
+        self.power_watts = aggregates['watts']
+        self.unparsed_power = aggregates['unparsed'].astype(int)
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(_tally(rows))
+
+    def updated(self, removed_rows, added_rows):
+        """New rollup with removed_rows taken out and added_rows put in, without a full recount"""
+        aggregates = {
+            'units': self.units,
+            'status': self.status_counts,
+            'type': self.type_counts,
+            'watts': self.power_watts,
+            'unparsed': self.unparsed_power,
+        }
+        for rows, sign in ((removed_rows, -1), (added_rows, 1)):
+            if len(rows):
+                delta = _tally(rows)
+                aggregates = {name: _combine(value, delta[name], sign) for name, value in aggregates.items()}
+        return StationRollup(aggregates)
+
+
+class RollupStore:
+    """Keeps the rollup for the latest data version and updates it from the rows that changed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.frame = None
+        self.hashes = None
+        self.rollup = None
+
+    def get(self, version, df, hashes):
+        """Rollup for df (merged cells filled in) given its asset_data.row_hashes"""
+        with self._lock:
+            if version == self.version:
+                return self.rollup
+
+            if self.rollup is None:
+                rollup = StationRollup.from_rows(rollup_rows(df, hashes.index))
+            else:
+                # Contributions are only rebuilt for the keys that differ
+                added, removed, changed = asset_data.diff_hashes(self.hashes, hashes)
+                gone = removed.append(changed)
+                fresh = added.append(changed)
+                rollup = self.rollup.updated(
+                    removed_rows=rollup_rows(self.frame.iloc[self.hashes.index.get_indexer(gone)], gone),
+                    added_rows=rollup_rows(df.iloc[hashes.index.get_indexer(fresh)], fresh),
+                )
+
+            self.version, self.frame, self.hashes, self.rollup = version, df, hashes, rollup
+            return rollup
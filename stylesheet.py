@@ -0,0 +1,45 @@
+import hashlib
+import os
+import re
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SOURCE = "assettagging.css"
+MINIFIED = "assettagging.min.css"
+
+
+def minify_css(css):
+    """Strip comments and whitespace that browsers ignore"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r"\s*:\s*(?=[^{}]*;)", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def build_stylesheet(static_dir=STATIC_DIR):
+    """Write the minified stylesheet next to its source when the source is newer.
+
+    Returns the minified file name and a short content hash for cache busting.
+    """
+    source_path = os.path.join(static_dir, SOURCE)
+    target_path = os.path.join(static_dir, MINIFIED)
+
+    if not os.path.exists(target_path) or os.path.getmtime(target_path) < os.path.getmtime(source_path):
+        with open(source_path, encoding="utf-8") as f:
+            minified = minify_css(f.read())
+        tmp_path = target_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(minified)
+        os.replace(tmp_path, target_path)
+    else:
+        with open(target_path, encoding="utf-8") as f:
+            minified = f.read()
+
+    return MINIFIED, hashlib.blake2b(minified.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def inline_stylesheet(static_dir=STATIC_DIR):
+    """Minified stylesheet as a <style> block, for when the static file cannot be written"""
+    with open(os.path.join(static_dir, SOURCE), encoding="utf-8") as f:
+        return f"<style>{minify_css(f.read())}</style>"
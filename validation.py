@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import asset_data
+
+TYPE_KEYWORDS = ('tools', 'equipment')
+# First data row in the sheet: title row and two header rows come first
+FIRST_SHEET_ROW = 4
+
+ISSUE_COLUMNS = ['hash', 'column', 'rule', 'value', 'message']
+
+
+def _blank(values):
+    return values.isna() | (values.astype(str).str.strip().isin(['', 'N/A']))
+
+
+def _issues(hashes, mask, column, rule, values, message):
+    if not mask.any():
+        return None
+    return pd.DataFrame({
+        'hash': hashes[mask],
+        'column': column,
+        'rule': rule,
+        'value': values[mask].astype(str).to_numpy(),
+        'message': message,
+    })
+
+
+def check_rows(rows, hashes, stations):
+    """Row-local rules, column by column. Blank merged-cell continuations are not flagged;
+    rows should arrive with Type already filled in from its merged cell"""
+    found = []
+    columns = rows.columns
+
+    station_col = columns[asset_data.STATION_COL]
+    station = rows[station_col].astype(str).str.strip()
+    found.append(_issues(hashes, (~station.isin(stations)).to_numpy(), station_col, 'enumeration', station,
+                         f"Station is not one of: {', '.join(stations)}"))
+
+    type_col = columns[asset_data.TYPE_COL]
+    asset_type = rows[type_col].astype(str).str.lower()
+    known_type = np.zeros(len(rows), dtype=bool)
+    for keyword in TYPE_KEYWORDS:
+        known_type |= asset_type.str.contains(keyword, regex=False).to_numpy()
+    found.append(_issues(hashes, ~known_type, type_col, 'enumeration', rows[type_col],
+                         "Type matches neither the Tools nor the Equipment tab"))
+
+    for position in asset_data.DIMENSION_COLS:
+        values = rows[columns[position]]
+        numeric = pd.to_numeric(values.astype(str).str.strip().str.replace(',', '', regex=False), errors='coerce')
+        bad = (numeric.isna() & ~_blank(values)).to_numpy()
+        found.append(_issues(hashes, bad, columns[position], 'numeric', values, "Dimension is not a number"))
+
+    image_col = columns[asset_data.IMAGE_COL]
+    image = rows[image_col].astype(str)
+    drive = image.str.contains('drive.google.com', regex=False)
+    bad_link = (drive & ~image.str.contains('/file/d/', regex=False)).to_numpy()
+    found.append(_issues(hashes, bad_link, image_col, 'url', image,
+                         "Drive link has no /file/d/ id, so the image cannot be shown"))
+
+    found = [f for f in found if f is not None]
+    if not found:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    return pd.concat(found, ignore_index=True)
+
+
+class Validator:
+    """Validates each data version once, re-checking only rows whose content hash is new"""
+
+    def __init__(self, stations):
+        self.stations = list(stations)
+        self._lock = threading.Lock()
+        self._checked = pd.Index([], dtype='uint64')
+        self._row_issues = pd.DataFrame(columns=ISSUE_COLUMNS)
+        self.version = None
+        self.report = None
+        self.rows_checked = 0
+
+    def validate(self, df, version):
+        """Issues for df as a DataFrame with the sheet row, asset number, column, rule and message"""
+        with self._lock:
+            if version == self.version:
+                return self.report
+
+            # Type sits in merged cells like the other merged columns; facets and
+            # rollups read the value each row inherits, so check that one too
+            type_col = df.columns[asset_data.TYPE_COL]
+            asset_name_col = df.columns[asset_data.ASSET_NAME_COL]
+            df = df.assign(**{type_col: asset_data.resolve_merged(df, asset_name_col, [type_col], blank='')[type_col]})
+
+            # Blank spacer rows are not assets
+            filled = np.zeros(len(df), dtype=bool)
+            for column in df.columns:
+                filled |= (df[column].astype(str).str.strip() != '').to_numpy()
+            sheet_rows = np.flatnonzero(filled) + FIRST_SHEET_ROW
+            df = df[filled]
+
+            columns = df.columns
+            hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+            # Identical rows share a hash, so only the first copy is checked;
+            # the merge below gives every copy its own issues
+            new_rows = ~pd.Index(hashes).isin(self._checked) & ~pd.Index(hashes).duplicated()
+            self.rows_checked = int(new_rows.sum())
+            if new_rows.any():
+                fresh = check_rows(df[new_rows], hashes[new_rows], self.stations)
+                self._row_issues = pd.concat([self._row_issues, fresh], ignore_index=True)
+                self._checked = self._checked.append(pd.Index(hashes[new_rows]))
+
+            # Forget rows that are no longer in the sheet
+            current = pd.Index(np.unique(hashes))
+            self._checked = self._checked.intersection(current)
+            self._row_issues = self._row_issues[self._row_issues['hash'].isin(current)]
+
+            rows = pd.DataFrame({
+                'hash': hashes,
+                'sheet_row': sheet_rows,
+                'asset_number': df[columns[asset_data.ASSET_NUMBER_COL]].astype(str).to_numpy(),
+            })
+            report = rows.merge(self._row_issues, on='hash')
+
+            # Uniqueness depends on the whole column, so it is never cached
+            asset_number = df[columns[asset_data.ASSET_NUMBER_COL]].astype(str).str.strip()
+            duplicate = asset_number.duplicated(keep=False) & (asset_number != '')
+            missing = asset_number == ''
+            for mask, rule, message in ((duplicate, 'unique', "Asset number appears more than once"),
+                                        (missing, 'required', "Asset number is blank")):
+                if mask.any():
+                    report = pd.concat([report, pd.DataFrame({
+                        'sheet_row': sheet_rows[mask.to_numpy()],
+                        'asset_number': asset_number[mask].to_numpy(),
+                        'column': columns[asset_data.ASSET_NUMBER_COL],
+                        'rule': rule,
+                        'value': asset_number[mask].to_numpy(),
+                        'message': message,
+                    })], ignore_index=True)
+
+            report = report.drop(columns='hash').sort_values(['sheet_row', 'rule'], kind='stable').reset_index(drop=True)
+            self.version, self.report = version, report
+            return report